@@ -6,6 +6,8 @@ import time
 import json
 import zipfile
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import shutil
 import yaml
 import platform
@@ -13,10 +15,17 @@ import tempfile
 from datetime import datetime
 from pathlib import Path
 from urllib.parse import urlparse
-import glob
 import random
-import base64
+import re
+import codecs
+import io
+import shlex
+import selectors
 import sys
+import atexit
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 # 跨平台信号处理
 try:
@@ -24,48 +33,204 @@ try:
 except ImportError:
     signal = None  # Windows某些情况下可能不支持某些信号
 
+# 可选的高性能JSON库，未安装时使用标准库json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# PyYAML编译了libyaml时使用C实现的解析器，否则退回纯Python实现
+YAML_SAFE_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 # 状态文件
 STATUS_FILE = "test_status.json"
 OUTPUT_FILE = "test_output.txt"
 DATASET_INFO_FILE = "dataset_info.json"
 CONVERSION_OUTPUT_FILE = "conversion_output.txt"
-MAPPING_FILE = "pt_dataset_mapping.json"  # 新增: 映射关系文件
+MAPPING_FILE = "pt_dataset_mapping.jsonl"  # 新增: 映射关系文件（每行一条记录，追加写入）
+LEGACY_MAPPING_FILE = "pt_dataset_mapping.json"  # 旧版整体JSON格式的映射文件
+
+# 文件读写块大小
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # 下载时每次读取1MB
+DOWNLOAD_TIMEOUT = (5, 30)  # 下载超时（连接超时, 读取超时），单位秒
+COPY_BUFFER_SIZE = 8 * 1024 * 1024  # 写入ZIP包时每次复制8MB
+DATASET_SPOOL_MAX_SIZE = 64 * 1024 * 1024  # URL下载的数据集不超过64MB时只保存在内存中
+
+# 数据集图片扩展名（小写）
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp'})
+
+# 并行复制图片的线程数（I/O密集，线程数可多于CPU核数）
+IMAGE_COPY_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# 子进程输出读取
+PROCESS_OUTPUT_BUFFER_SIZE = 64 * 1024  # 管道缓冲区大小
+PROCESS_OUTPUT_CHUNK_SIZE = 64 * 1024  # 每次最多读取的字节数
+LOG_FLUSH_CHUNKS = 32  # 输出密集时最多累积的块数
+LOG_FLUSH_INTERVAL = 0.25  # 输出密集时的最长刷新间隔（秒）
+LOG_WRITE_BUFFER_SIZE = 256 * 1024  # 子进程日志文件的写缓冲区大小，刷新之间的小块输出合并为一次写入
+
+# 下载进度条刷新节流
+PROGRESS_UPDATE_INTERVAL = 0.1  # 最短刷新间隔（秒）
+PROGRESS_UPDATE_BYTES = 4 * 1024 * 1024  # 或每下载4MB刷新一次
+
+TRAINING_OUTPUT_REFRESH_INTERVAL = 2  # 训练进行中时训练输出区域的自动刷新间隔（秒）
+CONVERSION_OUTPUT_REFRESH_INTERVAL = 2  # 转换进行中时转换日志区域的自动刷新间隔（秒）
+
+# 界面常量
+TRAINING_STATUS_ICONS = {
+    "idle": "⚪ 待机中",
+    "running": "🟢 训练中...",
+    "converting": "🔄 转换中...",
+    "completed": "✅ 训练完成",
+    "failed": "❌ 训练失败",
+    "stopped": "⏹️ 已停止"
+}
+CONVERSION_STATUS_ICONS = {
+    "idle": "⚪ 待机中",
+    "running": "🟢 训练中...",
+    "converting": "🔄 转换中...",
+    "completed": "✅ 完成",
+    "failed": "❌ 失败",
+    "stopped": "⏹️ 已停止"
+}
+RESULTS_PAGE_SIZE = 20  # 转换结果每次显示的条数，更早的结果点击"加载更多"后显示
+TRAINING_MODEL_OPTIONS = ("yolo11n.pt",)
+TRAINING_IMG_SIZE_OPTIONS = (320, 416, 512, 640, 768, 896, 1024, 1280)
+
+# "高级参数设置"中展示的固定参数
+TRAINING_FIXED_PARAMS = """
+batch=16                 # 批次大小
+patience=50              # 早停耐心值
+optimizer='auto'         # 优化器
+lr0=0.01                 # 初始学习率
+cos_lr=True              # 是否使用余弦学习率调度
+weight_decay=0.0005      # 权重衰减
+dropout=0.0              # 丢弃率
+label_smoothing=0.0      # 标签平滑
+"""
+ONNX_FIXED_PARAMS = """
+batch=1                  # 批次大小固定为1，适合设备推理
+include=['onnx']         # 仅导出ONNX格式
+half=True                # 使用FP16半精度
+int8=False               # 不使用INT8量化
+device=0                 # 使用第一个GPU设备
+"""
+
+@st.cache_resource(show_spinner=False)
+def get_shared_cache(name):
+    """获取跨Streamlit重新运行保留的缓存字典（脚本每次重新运行时模块级变量会被重置）"""
+    return {}
+
+# YAML解析缓存: (路径, mtime_ns) -> 解析结果
+_YAML_CACHE = get_shared_cache("yaml")
+
+# 映射文件缓存: (mtime_ns, 文件大小)、原始映射及规范化路径索引
+_MAPPING_CACHE = get_shared_cache("pt_dataset_mapping")
+
+# JSON文件缓存: 路径 -> ((mtime_ns, 文件大小), 解析结果)，用于状态文件和数据集信息
+_JSON_FILE_CACHE = get_shared_cache("json_files")
+
+# 日志文件缓存: 路径 -> 已读取的内容、字节数、修改时间、文件头及解码器状态
+_LOG_CACHE = get_shared_cache("log_files")
+LOG_HEAD_CHECK_SIZE = 256  # 用于判断日志文件是否被重写的文件头字节数
+FULL_LOG_DISPLAY_CHARS = 200 * 1024  # 完整日志框最多显示的字符数，超出部分截掉开头
+RECENT_LOG_TAIL_CHARS = 64 * 1024  # 查找最新日志时只切分日志末尾的字符数
+
+# 日志有效行数缓存: 日志名称 -> 已统计到的位置、有效行数及用于校验的文件头和末尾片段
+_LOG_LINE_COUNTS = get_shared_cache("log_line_counts")
+
+# 目录扫描缓存: 扫描参数 -> 扫描时间、各目录修改时间及扫描结果
+_SCAN_CACHE = get_shared_cache("directory_scan")
+SCAN_CACHE_TTL = 5  # 缓存最长有效期（秒），用于发现原地覆盖写入的文件大小变化
+SCAN_PARALLEL_MIN_DIRS = 8  # 子目录达到该数量时并发扫描，掩盖网络盘/机械盘上的stat延迟
+SCAN_WORKERS = 16
+EXPORT_SCAN_SUFFIXES = (".cvimodel", "_int8.zip")  # 转换结果目录一次扫描中收集的文件类型
+
+DOWNLOAD_EAGER_MAX_BYTES = 8 * 1024 * 1024  # 不超过该大小的文件直接显示下载按钮，更大的文件点击"准备下载"后才读取
+
+# ZIP包文件列表缓存: 路径 -> ((mtime_ns, 文件大小), 文件名列表)
+_ZIP_NAMES_CACHE = get_shared_cache("zip_names")
 
 # Docker镜像配置
 REQUIRED_DOCKER_IMAGES = [
     "lintheyoung/yolov11-trainer:latest",  # 用于训练和ONNX转换
     "lintheyoung/tpuc_dev_env_build"       # 用于CviModel转换
 ]
+DOCKER_PULL_WORKERS = 4  # 同时拉取的镜像数量上限
+
+# 常驻的CviModel转换容器（挂载整个transfer目录，各次转换通过docker exec复用）
+# 程序正常退出时删除；程序被强制结束时容器会保留，下次转换时继续复用
+CVIMODEL_CONTAINER_PREFIX = "onestep-tpuc-dev"  # 容器名称前缀，后面附加transfer目录路径的哈希
+CVIMODEL_CONTAINER_LABEL = "onestep.transfer"  # 记录容器挂载的transfer目录
+
+# 常驻转换容器状态: 本进程使用过的容器名称、退出清理是否已注册、正在容器中执行转换的docker exec进程
+_CVIMODEL_CONTAINERS = get_shared_cache("cvimodel_containers")
+
+# ==================== JSON工具函数 ====================
+
+def json_loads(text):
+    """解析JSON字符串或UTF-8字节串，优先使用orjson"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+def json_dumps(obj, indent=False):
+    """序列化为JSON字符串（保留中文字符），优先使用orjson；indent为True时缩进2个空格"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None)
 
 # ==================== 跨平台兼容性工具函数 ====================
 
+# 平台信息在进程运行期间不会变化，模块加载时获取一次
+PLATFORM_SYSTEM = platform.system()
+PLATFORM_MACHINE = platform.machine()
+IS_WINDOWS = PLATFORM_SYSTEM == "Windows"
+IS_LINUX = PLATFORM_SYSTEM == "Linux"
+IS_MACOS = PLATFORM_SYSTEM == "Darwin"
+
+# 子进程使用的环境变量：强制UTF-8输出
+SUBPROCESS_ENV = os.environ.copy()
+SUBPROCESS_ENV['PYTHONIOENCODING'] = 'utf-8'
+if IS_WINDOWS:
+    SUBPROCESS_ENV['CHCP'] = '65001'  # UTF-8 code page for Windows
+
 def get_platform_info():
     """获取平台信息"""
     return {
-        "system": platform.system(),
-        "machine": platform.machine(),
-        "is_windows": platform.system() == "Windows",
-        "is_linux": platform.system() == "Linux",
-        "is_macos": platform.system() == "Darwin"
+        "system": PLATFORM_SYSTEM,
+        "machine": PLATFORM_MACHINE,
+        "is_windows": IS_WINDOWS,
+        "is_linux": IS_LINUX,
+        "is_macos": IS_MACOS
     }
 
+# Docker挂载路径缓存: 本地路径 -> 转换结果（程序不会切换工作目录，相对路径的结果保持不变）
+_DOCKER_PATH_CACHE = get_shared_cache("docker_paths")
+
 def normalize_path_for_docker(local_path):
     """将本地路径转换为Docker挂载格式"""
+    cached = _DOCKER_PATH_CACHE.get(local_path)
+    if cached is not None:
+        return cached
+    
     abs_path = os.path.abspath(local_path)
     
-    if platform.system() == "Windows":
+    if IS_WINDOWS and len(abs_path) > 1 and abs_path[1] == ':':
         # Windows: C:\path -> /c/path
-        if len(abs_path) > 1 and abs_path[1] == ':':
-            drive = abs_path[0].lower()
-            path = abs_path[2:].replace('\\', '/')
-            return f"/{drive}{path}"
+        drive = abs_path[0].lower()
+        path = abs_path[2:].replace('\\', '/')
+        docker_path = f"/{drive}{path}"
+    else:
+        # Linux/Mac: 直接使用，但确保使用正斜杠
+        docker_path = abs_path.replace(os.sep, "/")
     
-    # Linux/Mac: 直接使用，但确保使用正斜杠
-    return abs_path.replace(os.sep, "/")
+    _DOCKER_PATH_CACHE[local_path] = docker_path
+    return docker_path
 
 def safe_chmod(file_path, mode=0o755):
     """安全的chmod操作，跨平台兼容，增强错误处理"""
-    if platform.system() != "Windows":
+    if not IS_WINDOWS:
         try:
             # 首先检查文件是否存在
             if not os.path.exists(file_path):
@@ -91,22 +256,19 @@ def safe_chmod(file_path, mode=0o755):
         # Windows系统跳过chmod
         return True
 
+PROCESS_TERMINATE_TIMEOUT = 2  # SIGTERM后等待进程退出的最长时间（秒），超时后发送SIGKILL
+
 def terminate_process_cross_platform(pid):
     """跨平台进程终止"""
     if not pid:
         return False
         
     try:
-        if platform.system() == "Windows":
-            # Windows使用taskkill，设置正确的编码
-            env = os.environ.copy()
-            env['PYTHONIOENCODING'] = 'utf-8'
-            env['CHCP'] = '65001'
-            
-            result = subprocess.run(f"taskkill /F /PID {pid}", 
-                                  shell=True, check=False, 
-                                  capture_output=True, text=True,
-                                  encoding='utf-8', errors='replace', env=env)
+        if IS_WINDOWS:
+            # Windows使用taskkill，只关心退出码，输出直接丢弃无需解码
+            result = subprocess.run(["taskkill", "/F", "/PID", str(pid)],
+                                  check=False,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             return result.returncode == 0
         else:
             # Linux/Mac使用信号
@@ -116,9 +278,13 @@ def terminate_process_cross_platform(pid):
                 
             try:
                 os.kill(pid, signal.SIGTERM)  # 先尝试温和终止
-                time.sleep(2)
-                # 检查进程是否还存在
-                os.kill(pid, 0)  # 检查进程是否存在
+                # 以指数退避轮询进程是否已退出，最多等待PROCESS_TERMINATE_TIMEOUT秒
+                deadline = time.monotonic() + PROCESS_TERMINATE_TIMEOUT
+                delay = 0.01
+                while time.monotonic() < deadline:
+                    os.kill(pid, 0)  # 检查进程是否存在，已退出时抛出ProcessLookupError
+                    time.sleep(delay)
+                    delay = min(delay * 2, 0.2)
                 os.kill(pid, signal.SIGKILL)  # 强制终止
             except ProcessLookupError:
                 pass  # 进程已经终止
@@ -132,11 +298,8 @@ def terminate_process_cross_platform(pid):
 def run_subprocess_safe(cmd, timeout=30, shell=False, cwd=None):
     """安全的subprocess调用，处理编码问题"""
     try:
-        # 设置环境变量强制UTF-8输出
-        env = os.environ.copy()
-        env['PYTHONIOENCODING'] = 'utf-8'
-        if platform.system() == "Windows":
-            env['CHCP'] = '65001'  # UTF-8 code page for Windows
+        # 强制UTF-8输出的环境变量（模块加载时构建一次）
+        env = SUBPROCESS_ENV
         
         if isinstance(cmd, str):
             shell = True
@@ -157,24 +320,35 @@ def run_subprocess_safe(cmd, timeout=30, shell=False, cwd=None):
         print(f"subprocess执行失败: {e}")
         return None
 
+# 可执行文件路径缓存: 程序名 -> shutil.which查找到的完整路径
+_EXECUTABLE_PATHS = get_shared_cache("executable_paths")
+
 def create_subprocess_safe(cmd, cwd=None):
-    """创建安全的subprocess.Popen，处理编码问题"""
+    """创建安全的subprocess.Popen，输出以二进制方式读取，由读取日志的一方负责解码
+    
+    cmd为参数列表时直接启动程序，不经过shell；Python创建的文件描述符默认不可继承，
+    因此close_fds=False是安全的，Linux上还可以让subprocess使用posix_spawn代替fork
+    """
     try:
-        # 设置环境变量强制UTF-8输出
-        env = os.environ.copy()
-        env['PYTHONIOENCODING'] = 'utf-8'
-        if platform.system() == "Windows":
-            env['CHCP'] = '65001'  # UTF-8 code page for Windows
+        # 强制UTF-8输出的环境变量（模块加载时构建一次）
+        env = SUBPROCESS_ENV
+        
+        shell = isinstance(cmd, str)
+        if not shell:
+            # 使用可执行文件的完整路径，posix_spawn要求程序路径包含目录；查找结果跨重新运行缓存
+            executable = _EXECUTABLE_PATHS.get(cmd[0])
+            if executable is None:
+                executable = shutil.which(cmd[0]) or cmd[0]
+                _EXECUTABLE_PATHS[cmd[0]] = executable
+            cmd = [executable] + list(cmd[1:])
         
         process = subprocess.Popen(
             cmd,
-            shell=True,
+            shell=shell,
+            close_fds=shell,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            universal_newlines=True,
-            encoding='utf-8',
-            errors='replace',  # 遇到无法解码的字符时替换而不是报错
-            bufsize=1,
+            bufsize=PROCESS_OUTPUT_BUFFER_SIZE,
             env=env,
             cwd=cwd
         )
@@ -183,6 +357,59 @@ def create_subprocess_safe(cmd, cwd=None):
         print(f"创建subprocess失败: {e}")
         return None
 
+def iter_process_output(process):
+    """按块产出子进程的输出，输出结束时停止
+    
+    非Windows系统用selectors(epoll/kqueue)等待管道可读，再用os.read读取已有的数据，
+    等待超过LOG_FLUSH_INTERVAL秒仍无输出时产出None，便于调用方刷新已缓冲的内容；
+    Windows的select不支持管道，使用read1阻塞读取
+    """
+    if IS_WINDOWS:
+        # read1只返回当前已有的数据，不会等凑满整块才返回
+        yield from iter(lambda: process.stdout.read1(PROCESS_OUTPUT_CHUNK_SIZE), b'')
+        return
+    
+    fd = process.stdout.fileno()
+    with selectors.DefaultSelector() as selector:
+        selector.register(fd, selectors.EVENT_READ)
+        while True:
+            if not selector.select(timeout=LOG_FLUSH_INTERVAL):
+                yield None  # 管道空闲
+                continue
+            chunk = os.read(fd, PROCESS_OUTPUT_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+def write_process_output(process, f):
+    """将子进程输出按块写入已打开的文本日志文件，不逐行解码"""
+    # 先把文本层缓冲写出，再直接写入底层二进制缓冲区
+    f.flush()
+    raw_file = f.buffer
+    
+    last_flush_time = time.monotonic()
+    chunks_since_flush = 0
+    
+    for chunk in iter_process_output(process):
+        if chunk is not None:
+            raw_file.write(chunk)
+            chunks_since_flush += 1
+        
+        # 批量刷新：管道空闲LOG_FLUSH_INTERVAL秒（产出None）时立即刷新，逐行输出的小块数据不再每块都刷新；
+        # Windows下读取阻塞、不会产出None，读到的数据不满一块即视为输出暂停；
+        # 输出密集时每LOG_FLUSH_CHUNKS块或每LOG_FLUSH_INTERVAL秒刷新一次
+        now = time.monotonic()
+        if chunks_since_flush and (chunk is None
+                                   or (IS_WINDOWS and len(chunk) < PROCESS_OUTPUT_CHUNK_SIZE)
+                                   or chunks_since_flush >= LOG_FLUSH_CHUNKS
+                                   or now - last_flush_time >= LOG_FLUSH_INTERVAL):
+            # 只需写入系统缓存，界面读取日志即可看到新内容，无需fsync同步到磁盘
+            raw_file.flush()
+            last_flush_time = now
+            chunks_since_flush = 0
+    
+    raw_file.flush()
+
 def create_directory_safe(directory_path):
     """安全创建目录，处理权限问题，增强版本"""
     try:
@@ -190,7 +417,7 @@ def create_directory_safe(directory_path):
         os.makedirs(directory_path, exist_ok=True)
         
         # 在非Windows系统下设置合适的权限
-        if platform.system() != "Windows":
+        if not IS_WINDOWS:
             try:
                 # 尝试设置目录权限为755 (rwxr-xr-x)
                 os.chmod(directory_path, 0o755)
@@ -226,10 +453,7 @@ def check_docker_environment():
         print("🔍 检查Docker环境...")
         
         # 设置环境变量强制UTF-8输出（Windows兼容）
-        env = os.environ.copy()
-        env['PYTHONIOENCODING'] = 'utf-8'
-        if platform.system() == "Windows":
-            env['CHCP'] = '65001'  # UTF-8 code page for Windows
+        env = SUBPROCESS_ENV
         
         # 检查Docker是否安装
         result = subprocess.run(['docker', '--version'], 
@@ -272,11 +496,8 @@ def check_docker_environment():
 def check_docker_permissions():
     """检查Docker权限（Linux特有问题）"""
     try:
-        # 设置环境变量强制UTF-8输出
-        env = os.environ.copy()
-        env['PYTHONIOENCODING'] = 'utf-8'
-        if platform.system() == "Windows":
-            env['CHCP'] = '65001'
+        # 强制UTF-8输出的环境变量（模块加载时构建一次）
+        env = SUBPROCESS_ENV
         
         result = subprocess.run(['docker', 'ps'], 
                               capture_output=True, text=True, timeout=10,
@@ -303,11 +524,8 @@ def check_nvidia_docker():
     try:
         print("🔍 检查NVIDIA Docker支持...")
         
-        # 设置环境变量强制UTF-8输出
-        env = os.environ.copy()
-        env['PYTHONIOENCODING'] = 'utf-8'
-        if platform.system() == "Windows":
-            env['CHCP'] = '65001'
+        # 强制UTF-8输出的环境变量（模块加载时构建一次）
+        env = SUBPROCESS_ENV
         
         result = subprocess.run([
             'docker', 'run', '--rm', '--gpus', 'all', 
@@ -328,11 +546,8 @@ def check_nvidia_docker():
 def check_docker_image_exists(image_name):
     """检查Docker镜像是否存在"""
     try:
-        # 设置环境变量强制UTF-8输出
-        env = os.environ.copy()
-        env['PYTHONIOENCODING'] = 'utf-8'
-        if platform.system() == "Windows":
-            env['CHCP'] = '65001'
+        # 强制UTF-8输出的环境变量（模块加载时构建一次）
+        env = SUBPROCESS_ENV
         
         result = subprocess.run(['docker', 'images', '-q', image_name], 
                               capture_output=True, text=True, timeout=30,
@@ -348,11 +563,8 @@ def pull_docker_image(image_name):
         print(f"📥 正在下载Docker镜像: {image_name}")
         print("这可能需要几分钟时间，请耐心等待...")
         
-        # 设置环境变量强制UTF-8输出
-        env = os.environ.copy()
-        env['PYTHONIOENCODING'] = 'utf-8'
-        if platform.system() == "Windows":
-            env['CHCP'] = '65001'
+        # 强制UTF-8输出的环境变量（模块加载时构建一次）
+        env = SUBPROCESS_ENV
         
         result = subprocess.run(['docker', 'pull', image_name], 
                               capture_output=True, text=True, timeout=1800,
@@ -432,126 +644,240 @@ def initialize_environment():
 
 # ==================== 状态管理函数 ====================
 
-def init_status():
-    """初始化状态"""
-    default_status = {
+# 最近一次写入的状态，用于跳过重复写入
+_STATUS_CACHE = get_shared_cache("status")
+
+def get_default_status():
+    """默认（空闲）状态"""
+    return {
         "status": "idle",
         "pid": None,
         "timestamp": datetime.now().isoformat(),
         "current_run": None  # 添加当前运行的任务标识
     }
-    
+
+def init_status():
+    """初始化状态"""
     if not os.path.exists(STATUS_FILE):
+        write_status_file(get_default_status())
+
+def write_status_file(status_data):
+    """原子写入状态文件：先写临时文件再替换，避免读到写了一半的JSON"""
+    temp_path = f"{STATUS_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(json_dumps(status_data))
+    try:
+        os.replace(temp_path, STATUS_FILE)
+    except PermissionError:
+        # Windows下目标文件正被读取时无法替换，退回直接写入
+        os.remove(temp_path)
         with open(STATUS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(default_status, f)
+            f.write(json_dumps(status_data))
+    _STATUS_CACHE["last_written"] = status_data
+    _JSON_FILE_CACHE.pop(STATUS_FILE, None)
+
+def load_json_cached(file_path):
+    """读取JSON文件，按文件修改时间和大小缓存解析结果；文件不存在时抛出FileNotFoundError"""
+    stat_result = os.stat(file_path)
+    cache_key = (stat_result.st_mtime_ns, stat_result.st_size)
+    cached = _JSON_FILE_CACHE.get(file_path)
+    if cached and cached[0] == cache_key:
+        return cached[1]
+    with open(file_path, 'rb') as f:
+        data = json_loads(f.read())
+    _JSON_FILE_CACHE[file_path] = (cache_key, data)
+    return data
 
 def get_status():
     """获取状态"""
     try:
-        with open(STATUS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except:
-        init_status()
-        return get_status()
+        # 返回副本，调用方修改不会影响缓存
+        return dict(load_json_cached(STATUS_FILE))
+    except FileNotFoundError:
+        # 状态文件不存在时写入默认状态；写入失败（权限、磁盘已满）也直接返回默认状态，不再递归重试
+        default_status = get_default_status()
+        try:
+            write_status_file(default_status)
+        except OSError as e:
+            print(f"写入状态文件失败: {e}")
+        return dict(default_status)
+    except (OSError, ValueError) as e:
+        # 文件无法读取或内容损坏时按空闲状态处理，下次set_status会重写文件
+        print(f"读取状态文件失败: {e}")
+        return get_default_status()
 
 def set_status(status, pid=None, current_run=None):
     """设置状态"""
-    status_data = get_status()
+    # 所有字段都已提供时无需读取旧状态
+    if pid is not None and current_run is not None:
+        status_data = {}
+    else:
+        status_data = get_status()
     status_data["status"] = status
-    status_data["timestamp"] = datetime.now().isoformat()
     
     if pid is not None:
         status_data["pid"] = pid
         
     if current_run is not None:
         status_data["current_run"] = current_run
-        
-    with open(STATUS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(status_data, f)
+    
+    # 状态未变化时跳过重复写入
+    last_written = _STATUS_CACHE.get("last_written")
+    if (last_written and os.path.exists(STATUS_FILE)
+            and all(last_written.get(key) == status_data.get(key) for key in ("status", "pid", "current_run"))):
+        return
+    
+    status_data["timestamp"] = datetime.now().isoformat()
+    write_status_file(status_data)
 
 # ==================== 数据集管理函数 ====================
 
 def save_dataset_info(info):
     """保存数据集信息"""
     with open(DATASET_INFO_FILE, 'w', encoding='utf-8') as f:
-        json.dump(info, f, ensure_ascii=False, indent=2)
+        f.write(json_dumps(info, indent=True))
+    _JSON_FILE_CACHE.pop(DATASET_INFO_FILE, None)
 
 def get_dataset_info():
     """获取数据集信息"""
     try:
-        if os.path.exists(DATASET_INFO_FILE):
-            with open(DATASET_INFO_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return None
+        return load_json_cached(DATASET_INFO_FILE)
     except:
         return None
 
 def save_pt_dataset_mapping(pt_file_path, dataset_path, run_name):
-    """保存pt文件和数据集的映射关系"""
+    """保存pt文件和数据集的映射关系（追加一行，不重写整个文件）"""
+    return save_pt_dataset_mappings([pt_file_path], dataset_path, run_name)
+
+def save_pt_dataset_mappings(pt_file_paths, dataset_path, run_name):
+    """批量保存多个pt文件到同一数据集的映射关系，一次写入"""
     try:
-        # 读取现有映射
-        mapping = {}
-        if os.path.exists(MAPPING_FILE):
-            with open(MAPPING_FILE, 'r', encoding='utf-8') as f:
-                mapping = json.load(f)
+        created_time = datetime.now().isoformat()
         
         # 添加新映射 - 适配新的数据集结构
-        mapping[pt_file_path] = {
-            "dataset_path": dataset_path,
-            "run_name": run_name,
-            "created_time": datetime.now().isoformat(),
-            "images_path": os.path.join(dataset_path, "images")  # 直接指向images目录
-        }
+        lines = []
+        for pt_file_path in pt_file_paths:
+            entry = {
+                "pt": pt_file_path,
+                "dataset_path": dataset_path,
+                "run_name": run_name,
+                "created_time": created_time,
+                "images_path": os.path.join(dataset_path, "images")  # 直接指向images目录
+            }
+            lines.append(json_dumps(entry) + "\n")
         
         # 保存映射
-        with open(MAPPING_FILE, 'w', encoding='utf-8') as f:
-            json.dump(mapping, f, ensure_ascii=False, indent=2)
+        with open(MAPPING_FILE, 'a', encoding='utf-8') as f:
+            f.write("".join(lines))
             
         return True
     except Exception as e:
         print(f"保存映射关系失败: {e}")
         return False
 
+def read_pt_dataset_mapping_file():
+    """逐行读取映射文件，返回(映射字典, 有效记录行数)，同一pt文件以最后一条记录为准"""
+    mapping = {}
+    line_count = 0
+    # 按字节逐行读取，orjson可直接解析UTF-8字节，无需先解码为字符串
+    with open(MAPPING_FILE, 'rb') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json_loads(line)
+            except ValueError:
+                continue  # 跳过写入中断产生的不完整行
+            pt_file_path = entry.pop("pt", None)
+            if pt_file_path:
+                mapping[pt_file_path] = entry
+                line_count += 1
+    return mapping, line_count
+
+def compact_pt_dataset_mapping():
+    """迁移旧版映射文件，并在重复记录过多时压缩映射文件"""
+    try:
+        # 旧版JSON映射文件迁移为逐行格式
+        if not os.path.exists(MAPPING_FILE) and os.path.exists(LEGACY_MAPPING_FILE):
+            with open(LEGACY_MAPPING_FILE, 'rb') as f:
+                legacy_mapping = json_loads(f.read())
+            with open(MAPPING_FILE, 'w', encoding='utf-8') as f:
+                for pt_file_path, info in legacy_mapping.items():
+                    f.write(json_dumps({"pt": pt_file_path, **info}) + "\n")
+            return True
+        
+        if not os.path.exists(MAPPING_FILE):
+            return True
+        
+        # 记录行数超过实际映射数量的2倍时重写文件
+        mapping, line_count = read_pt_dataset_mapping_file()
+        if line_count > 2 * len(mapping):
+            temp_path = MAPPING_FILE + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for pt_file_path, info in mapping.items():
+                    f.write(json_dumps({"pt": pt_file_path, **info}) + "\n")
+            os.replace(temp_path, MAPPING_FILE)
+        return True
+    except Exception as e:
+        print(f"压缩映射文件失败: {e}")
+        return False
+
+def load_pt_dataset_mapping():
+    """读取映射文件，返回(原始映射, 规范化路径索引)，按文件修改时间缓存"""
+    try:
+        stat_result = os.stat(MAPPING_FILE)
+    except FileNotFoundError:
+        return {}, {}
+    
+    cache_key = (stat_result.st_mtime_ns, stat_result.st_size)
+    if _MAPPING_CACHE.get("key") != cache_key:
+        raw, _ = read_pt_dataset_mapping_file()
+        _MAPPING_CACHE["raw"] = raw
+        _MAPPING_CACHE["norm"] = {os.path.normcase(os.path.realpath(key)): value for key, value in raw.items()}
+        _MAPPING_CACHE["key"] = cache_key
+    
+    return _MAPPING_CACHE["raw"], _MAPPING_CACHE["norm"]
+
 def get_pt_dataset_mapping(pt_file_path):
     """获取pt文件对应的数据集路径"""
     try:
-        if os.path.exists(MAPPING_FILE):
-            with open(MAPPING_FILE, 'r', encoding='utf-8') as f:
-                mapping = json.load(f)
-                
-                # 首先尝试直接匹配
-                if pt_file_path in mapping:
-                    return mapping[pt_file_path]
-                
-                # 如果直接匹配失败，尝试绝对路径匹配
-                abs_path = os.path.abspath(pt_file_path)
-                if abs_path in mapping:
-                    return mapping[abs_path]
-                
-                # 如果还是失败，尝试规范化路径匹配
-                normalized_path = os.path.normpath(abs_path)
-                if normalized_path in mapping:
-                    return mapping[normalized_path]
-                
-                # 最后尝试通过文件名匹配（如果路径分隔符不同）
-                for key in mapping.keys():
-                    if os.path.normpath(key) == normalized_path:
-                        return mapping[key]
-                
-        return None
+        mapping, normalized_mapping = load_pt_dataset_mapping()
+        
+        # 首先尝试直接匹配
+        if pt_file_path in mapping:
+            return mapping[pt_file_path]
+        
+        # 再通过真实路径匹配（兼容相对路径、符号链接、不同的路径分隔符和大小写）
+        return normalized_mapping.get(os.path.normcase(os.path.realpath(pt_file_path)))
     except Exception as e:
         print(f"获取映射关系失败: {e}")
         return None
 
+def load_yaml_cached(yaml_path):
+    """读取YAML文件，按文件修改时间缓存解析结果"""
+    key = (os.path.abspath(yaml_path), os.stat(yaml_path).st_mtime_ns)
+    if key not in _YAML_CACHE:
+        with open(yaml_path, 'r', encoding='utf-8') as f:
+            _YAML_CACHE[key] = yaml.load(f, Loader=YAML_SAFE_LOADER)
+    return _YAML_CACHE[key]
+
+def move_yaml_cache(old_path, new_path):
+    """文件移动后把已解析的YAML缓存转到新路径（移动会保留修改时间），避免重新解析"""
+    mtime_ns = os.stat(new_path).st_mtime_ns
+    old_key = (os.path.abspath(old_path), mtime_ns)
+    if old_key in _YAML_CACHE:
+        _YAML_CACHE[(os.path.abspath(new_path), mtime_ns)] = _YAML_CACHE.pop(old_key)
+
 def get_dataset_labels():
     """从data.yaml中获取标签列表"""
     try:
-        data_yaml_path = "data/data.yaml"
-        if os.path.exists(data_yaml_path):
-            with open(data_yaml_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-                if 'names' in data:
-                    return data['names']
+        # 缓存命中时只需一次stat，文件不存在时由stat直接抛出FileNotFoundError
+        data = load_yaml_cached("data/data.yaml")
+        if data and 'names' in data:
+            return data['names']
+        return []
+    except FileNotFoundError:
         return []
     except Exception as e:
         print(f"获取数据集标签失败: {e}")
@@ -640,6 +966,13 @@ while not app.need_exit():
     except Exception as e:
         return None, f"❌ 创建检测脚本失败: {str(e)}"
 
+def write_file_to_zip(zipf, file_path, arcname):
+    """把文件不压缩地写入ZIP，使用大缓冲区复制（ZipFile.write每次只复制8KB）"""
+    zip_info = zipfile.ZipInfo.from_file(file_path, arcname)
+    zip_info.compress_type = zipfile.ZIP_STORED
+    with open(file_path, 'rb') as src, zipf.open(zip_info, 'w') as dest:
+        shutil.copyfileobj(src, dest, COPY_BUFFER_SIZE)
+
 def create_model_package_zip(cvimodel_path, mud_path, script_path, conversion_name):
     """创建模型包ZIP文件，包含检测脚本"""
     try:
@@ -652,14 +985,16 @@ def create_model_package_zip(cvimodel_path, mud_path, script_path, conversion_na
         zip_path = os.path.join(model_dir, zip_filename)
         
         # 创建ZIP文件
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # 添加cvimodel文件
-            zipf.write(cvimodel_path, os.path.basename(cvimodel_path))
-            # 添加mud文件
-            zipf.write(mud_path, os.path.basename(mud_path))
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED, allowZip64=True) as zipf:
+            # 添加cvimodel文件（模型二进制几乎无法压缩，直接存储）
+            write_file_to_zip(zipf, cvimodel_path, os.path.basename(cvimodel_path))
+            # 添加mud文件（小文本文件，使用最快的压缩级别）
+            zipf.write(mud_path, os.path.basename(mud_path),
+                       compress_type=zipfile.ZIP_DEFLATED, compresslevel=1)
             # 添加检测脚本文件
             if script_path and os.path.exists(script_path):
-                zipf.write(script_path, os.path.basename(script_path))
+                zipf.write(script_path, os.path.basename(script_path),
+                           compress_type=zipfile.ZIP_DEFLATED, compresslevel=1)
         
         # 获取文件大小
         zip_size = os.path.getsize(zip_path) / (1024 * 1024)  # MB
@@ -672,27 +1007,31 @@ def create_model_package_zip(cvimodel_path, mud_path, script_path, conversion_na
 # ==================== 图片处理函数 ====================
 
 def collect_images_from_dataset(images_path, target_count=200):
-    """从数据集的images目录中收集图片"""
-    image_extensions = ['*.jpg', '*.jpeg', '*.png', '*.bmp', '*.tiff', '*.webp']
-    all_images = []
-    
-    # 检查images目录是否存在
-    if not os.path.exists(images_path):
+    """从数据集的images目录中收集图片，返回(随机抽取的图片列表, 找到的图片总数)"""
+    # 一次遍历收集images文件夹中的所有图片（扩展名不区分大小写，与glob一样跳过隐藏文件）
+    try:
+        with os.scandir(images_path) as entries:
+            all_images = [entry.path for entry in entries
+                          if not entry.name.startswith('.')
+                          and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS
+                          and entry.is_file()]
+    except FileNotFoundError:
         print(f"Images目录不存在: {images_path}")
-        return []
-    
-    # 收集images文件夹中的所有图片
-    for ext in image_extensions:
-        all_images.extend(glob.glob(os.path.join(images_path, ext)))
-        all_images.extend(glob.glob(os.path.join(images_path, ext.upper())))
-    
-    # 去重并随机打乱
-    all_images = list(set(all_images))
-    random.shuffle(all_images)
+        return [], 0
     
     print(f"在 {images_path} 中找到 {len(all_images)} 张图片")
     
-    return all_images
+    # 随机抽取最多target_count张，无需打乱整个列表
+    sample_count = min(target_count, len(all_images))
+    return random.sample(all_images, sample_count), len(all_images)
+
+def link_or_copy_file(source_path, target_path):
+    """优先创建硬链接（同一文件系统下不复制数据），失败时退回复制"""
+    try:
+        os.link(source_path, target_path)
+    except OSError:
+        # 量化用的图片无需保留元数据；copyfile不调用copystat，Linux上还会使用sendfile在内核中复制
+        shutil.copyfile(source_path, target_path)
 
 def copy_images_to_transfer(images_list, target_dir, target_count=200):
     """复制图片到transfer目录"""
@@ -701,18 +1040,15 @@ def copy_images_to_transfer(images_list, target_dir, target_count=200):
         images_dir = os.path.join(target_dir, "images")
         create_directory_safe(images_dir)
         
-        copied_images = []
+        copy_tasks = []  # (源路径, 目标路径)
         
         # 如果图片数量足够
         if len(images_list) >= target_count:
             selected_images = images_list[:target_count]
             for i, img_path in enumerate(selected_images):
-                if os.path.exists(img_path):
-                    file_ext = os.path.splitext(img_path)[1]
-                    target_name = f"image_{i+1:03d}{file_ext}"
-                    target_path = os.path.join(images_dir, target_name)
-                    shutil.copy2(img_path, target_path)
-                    copied_images.append(target_path)
+                file_ext = os.path.splitext(img_path)[1]
+                target_name = f"image_{i+1:03d}{file_ext}"
+                copy_tasks.append((img_path, os.path.join(images_dir, target_name)))
         
         # 如果图片数量不够，重复复制并重命名
         else:
@@ -722,12 +1058,21 @@ def copy_images_to_transfer(images_list, target_dir, target_count=200):
             
             for i in range(target_count):
                 source_img = images_list[i % available_count]  # 循环使用现有图片
-                if os.path.exists(source_img):
-                    file_ext = os.path.splitext(source_img)[1]
-                    target_name = f"image_{i+1:03d}{file_ext}"
-                    target_path = os.path.join(images_dir, target_name)
-                    shutil.copy2(source_img, target_path)
-                    copied_images.append(target_path)
+                file_ext = os.path.splitext(source_img)[1]
+                target_name = f"image_{i+1:03d}{file_ext}"
+                copy_tasks.append((source_img, os.path.join(images_dir, target_name)))
+        
+        # 多线程并行复制（文件读写时会释放GIL），源图片不存在时跳过，不再逐个预先检查
+        def copy_task(task):
+            try:
+                link_or_copy_file(*task)
+                return True
+            except FileNotFoundError:
+                return False
+        
+        with ThreadPoolExecutor(max_workers=IMAGE_COPY_WORKERS) as executor:
+            results = list(executor.map(copy_task, copy_tasks))
+        copied_images = [target_path for (_, target_path), copied in zip(copy_tasks, results) if copied]
         
         # 复制一张图片作为test图片
         test_image = None
@@ -735,7 +1080,7 @@ def copy_images_to_transfer(images_list, target_dir, target_count=200):
             test_source = copied_images[0]
             file_ext = os.path.splitext(test_source)[1]
             test_image = os.path.join(target_dir, f"test{file_ext}")
-            shutil.copy2(test_source, test_image)
+            link_or_copy_file(test_source, test_image)
         
         return copied_images, test_image
         
@@ -745,24 +1090,48 @@ def copy_images_to_transfer(images_list, target_dir, target_count=200):
 
 # ==================== 数据集下载和处理函数 ====================
 
+@st.cache_resource(show_spinner=False)
+def get_http_session():
+    """获取复用连接的requests会话，连接失败时自动重试"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        # 网关错误/服务暂不可用时也自动重试，复用连接池中的连接
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504))
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
 def download_file(url, local_filename, progress_placeholder=None):
     """下载文件"""
     try:
-        response = requests.get(url, stream=True)
+        response = get_http_session().get(url, stream=True, timeout=DOWNLOAD_TIMEOUT)
         response.raise_for_status()
         
         total_size = int(response.headers.get('content-length', 0))
         downloaded_size = 0
+        last_update_time = time.monotonic()
+        last_update_size = 0
         
         with open(local_filename, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
                 if chunk:
                     f.write(chunk)
                     downloaded_size += len(chunk)
                     
+                    # 节流刷新进度条，避免每个数据块都向前端发送消息
                     if progress_placeholder and total_size > 0:
-                        progress = downloaded_size / total_size
-                        progress_placeholder.progress(progress)
+                        now = time.monotonic()
+                        if (now - last_update_time >= PROGRESS_UPDATE_INTERVAL
+                                or downloaded_size - last_update_size >= PROGRESS_UPDATE_BYTES):
+                            progress_placeholder.progress(min(downloaded_size / total_size, 1.0))
+                            last_update_time = now
+                            last_update_size = downloaded_size
+        
+        if progress_placeholder and total_size > 0:
+            progress_placeholder.progress(min(downloaded_size / total_size, 1.0))
         
         return True
     except Exception as e:
@@ -770,7 +1139,7 @@ def download_file(url, local_filename, progress_placeholder=None):
         return False
 
 def extract_zip(zip_path, extract_to):
-    """解压ZIP文件"""
+    """解压ZIP文件，zip_path可以是文件路径或可随机读取的文件对象"""
     try:
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
             zip_ref.extractall(extract_to)
@@ -780,18 +1149,36 @@ def extract_zip(zip_path, extract_to):
         return False
 
 def find_data_yaml(directory):
-    """递归查找data.yaml文件"""
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if file.lower() in ['data.yaml', 'data.yml']:
-                return os.path.join(root, file)
+    """按层广度优先查找data.yaml文件，找到最浅的一个即返回"""
+    data_yaml_names = ('data.yaml', 'data.yml')
+    # 二级及更深的图片/标签目录文件数量多且通常不包含data.yaml，放到其它目录都查完后再查
+    deferred_names = {'images', 'labels', 'train', 'val', 'valid', 'test'}
+    
+    pending_dirs = deque([(directory, 0)])
+    deferred_dirs = deque()
+    while pending_dirs or deferred_dirs:
+        current_dir, depth = pending_dirs.popleft() if pending_dirs else deferred_dirs.popleft()
+        try:
+            entries = os.scandir(current_dir)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    # 根目录的子目录总是按顺序检查
+                    if depth == 0 or entry.name.lower() not in deferred_names:
+                        pending_dirs.append((entry.path, depth + 1))
+                    else:
+                        deferred_dirs.append((entry.path, depth + 1))
+                elif entry.name.lower() in data_yaml_names and entry.is_file():
+                    return entry.path
     return None
 
 def validate_dataset(data_yaml_path):
     """验证数据集格式"""
     try:
-        with open(data_yaml_path, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
+        # 复制一份，避免修改缓存中的数据
+        data = dict(load_yaml_cached(data_yaml_path))
         
         # 检查必要的字段
         required_fields = ['train', 'val', 'names']
@@ -817,14 +1204,12 @@ def process_uploaded_dataset(uploaded_file):
             shutil.rmtree(temp_dir)
         create_directory_safe(temp_dir)
         
-        # 保存上传的文件
-        zip_path = os.path.join(temp_dir, "dataset.zip")
-        with open(zip_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
+        # 上传的文件本身可随机读取，直接逐项解压，无需先另存一份ZIP到磁盘
+        uploaded_file.seek(0)
         
         # 解压文件
         extract_dir = os.path.join(temp_dir, "extracted")
-        if not extract_zip(zip_path, extract_dir):
+        if not extract_zip(uploaded_file, extract_dir):
             return False, "解压失败"
         
         # 查找data.yaml文件
@@ -849,6 +1234,9 @@ def process_uploaded_dataset(uploaded_file):
         dataset_root = os.path.dirname(data_yaml_path)
         shutil.move(dataset_root, data_dir)
         
+        # 复用验证时已解析的data.yaml，后续读取标签无需重新解析
+        move_yaml_cache(data_yaml_path, os.path.join(data_dir, os.path.basename(data_yaml_path)))
+        
         # 保存数据集信息
         dataset_info = {
             "source": "upload",
@@ -876,10 +1264,8 @@ def process_url_dataset(url):
             shutil.rmtree(temp_dir)
         create_directory_safe(temp_dir)
         
-        # 下载文件
-        parsed_url = urlparse(url)
-        filename = os.path.basename(parsed_url.path) or "dataset.zip"
-        zip_path = os.path.join(temp_dir, filename)
+        # 数据集文件名（仅用于记录数据集信息，下载内容不落盘）
+        filename = os.path.basename(urlparse(url).path) or "dataset.zip"
         
         # 显示下载进度
         progress_placeholder = st.empty()
@@ -887,30 +1273,44 @@ def process_url_dataset(url):
         progress_bar = st.progress(0)
         
         # 下载
-        response = requests.get(url, stream=True)
+        response = get_http_session().get(url, stream=True, timeout=DOWNLOAD_TIMEOUT)
         response.raise_for_status()
         response.encoding = 'utf-8'  # 明确设置编码
         
         total_size = int(response.headers.get('content-length', 0))
         downloaded_size = 0
-        
-        with open(zip_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
+        last_update_time = time.monotonic()
+        last_update_size = 0
+        
+        # 下载内容先写入内存缓冲，超过DATASET_SPOOL_MAX_SIZE时自动转存到临时目录下的文件
+        # 下载出错时也及时关闭响应，连接归还到会话的连接池
+        zip_buffer = tempfile.SpooledTemporaryFile(max_size=DATASET_SPOOL_MAX_SIZE, dir=temp_dir)
+        with response, zip_buffer:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
                 if chunk:
-                    f.write(chunk)
+                    zip_buffer.write(chunk)
                     downloaded_size += len(chunk)
                     
+                    # 节流刷新进度条，避免每个数据块都向前端发送消息
                     if total_size > 0:
-                        progress = downloaded_size / total_size
-                        progress_bar.progress(progress)
-                        progress_placeholder.text(f"下载中... {downloaded_size/(1024*1024):.1f}MB / {total_size/(1024*1024):.1f}MB")
-        
-        progress_placeholder.text("下载完成，开始解压...")
-        
-        # 解压文件
-        extract_dir = os.path.join(temp_dir, "extracted")
-        if not extract_zip(zip_path, extract_dir):
-            return False, "解压失败"
+                        now = time.monotonic()
+                        if (now - last_update_time >= PROGRESS_UPDATE_INTERVAL
+                                or downloaded_size - last_update_size >= PROGRESS_UPDATE_BYTES):
+                            progress_bar.progress(min(downloaded_size / total_size, 1.0))
+                            progress_placeholder.text(f"下载中... {downloaded_size/(1024*1024):.1f}MB / {total_size/(1024*1024):.1f}MB")
+                            last_update_time = now
+                            last_update_size = downloaded_size
+            
+            if total_size > 0:
+                progress_bar.progress(min(downloaded_size / total_size, 1.0))
+            
+            progress_placeholder.text("下载完成，开始解压...")
+            
+            # 直接从缓冲解压，无需先写出ZIP文件再读回
+            zip_buffer.seek(0)
+            extract_dir = os.path.join(temp_dir, "extracted")
+            if not extract_zip(zip_buffer, extract_dir):
+                return False, "解压失败"
         
         # 查找data.yaml文件
         data_yaml_path = find_data_yaml(extract_dir)
@@ -934,6 +1334,9 @@ def process_url_dataset(url):
         dataset_root = os.path.dirname(data_yaml_path)
         shutil.move(dataset_root, data_dir)
         
+        # 复用验证时已解析的data.yaml，后续读取标签无需重新解析
+        move_yaml_cache(data_yaml_path, os.path.join(data_dir, os.path.basename(data_yaml_path)))
+        
         # 保存数据集信息
         dataset_info = {
             "source": "url",
@@ -957,12 +1360,60 @@ def process_url_dataset(url):
 
 # ==================== 输出处理函数 ====================
 
+def new_log_decoder(state=None):
+    """创建与文本模式读取一致的增量解码器（UTF-8解码并统一换行符），可从保存的状态继续解码"""
+    decoder = io.IncrementalNewlineDecoder(
+        codecs.getincrementaldecoder('utf-8')(errors='replace'), translate=True
+    )
+    if state is not None:
+        decoder.setstate(state)
+    return decoder
+
+def read_log_file_cached(file_path):
+    """读取日志文件，按(大小, 修改时间)缓存；文件只是追加增长时仅读取新增部分"""
+    stat_result = os.stat(file_path)
+    cached = _LOG_CACHE.get(file_path)
+    if cached and cached["size"] == stat_result.st_size and cached["mtime_ns"] == stat_result.st_mtime_ns:
+        return cached["content"]
+    
+    with open(file_path, 'rb') as f:
+        head = f.read(LOG_HEAD_CHECK_SIZE)
+        
+        # 文件变大且文件头未变，说明只是追加写入
+        # 缓存在多个会话间共享，每次都从保存的状态新建解码器，不修改缓存中的对象
+        if (cached and stat_result.st_size > cached["size"]
+                and head[:len(cached["head"])] == cached["head"]):
+            f.seek(cached["size"])
+            decoder = new_log_decoder(cached["decoder_state"])
+            # 上次末尾暂缓的\r已先显示为换行，这里去掉后由解码器重新输出
+            content = cached["content"][:-1] if cached["pending_cr"] else cached["content"]
+            content += decoder.decode(f.read())
+        else:
+            decoder = new_log_decoder()
+            f.seek(0)
+            content = decoder.decode(f.read())
+        
+        # 末尾的\r要等下一个字节才能确定是否为\r\n，先按换行显示
+        decoder_state = decoder.getstate()
+        pending_cr = bool(decoder_state[1] & 1)
+        if pending_cr:
+            content += "\n"
+        
+        _LOG_CACHE[file_path] = {
+            "content": content,
+            "size": f.tell(),
+            "mtime_ns": stat_result.st_mtime_ns,
+            "head": head,
+            "decoder_state": decoder_state,
+            "pending_cr": pending_cr
+        }
+    return content
+
 def read_output():
     """读取输出"""
     try:
-        if os.path.exists(OUTPUT_FILE):
-            with open(OUTPUT_FILE, 'r', encoding='utf-8', errors='replace') as f:
-                return f.read()
+        return read_log_file_cached(OUTPUT_FILE)
+    except FileNotFoundError:
         return ""
     except Exception as e:
         return f"读取输出失败: {str(e)}"
@@ -970,13 +1421,65 @@ def read_output():
 def read_conversion_output():
     """读取转换输出"""
     try:
-        if os.path.exists(CONVERSION_OUTPUT_FILE):
-            with open(CONVERSION_OUTPUT_FILE, 'r', encoding='utf-8', errors='replace') as f:
-                return f.read()
+        return read_log_file_cached(CONVERSION_OUTPUT_FILE)
+    except FileNotFoundError:
         return ""
     except Exception as e:
         return f"读取转换输出失败: {str(e)}"
 
+def truncate_log_for_display(content, max_chars=FULL_LOG_DISPLAY_CHARS):
+    """只保留日志末尾max_chars个字符用于显示，避免每次刷新都把整个日志发送到浏览器"""
+    if len(content) <= max_chars:
+        return content
+    tail = content[-max_chars:]
+    # 从完整的一行开始显示
+    newline_pos = tail.find('\n')
+    if newline_pos != -1:
+        tail = tail[newline_pos + 1:]
+    return f"... (日志过长，已省略前面 {len(content) - len(tail)} 个字符) ...\n{tail}"
+
+def get_recent_log_lines(content, count=10, skip_separators=False):
+    """取日志中最近count行有内容的日志（最新的在前），从末尾向前逐行查找，不切分日志"""
+    limit = max(0, len(content) - RECENT_LOG_TAIL_CHARS)
+    recent_lines = []
+    end = len(content)
+    while len(recent_lines) < count:
+        newline_pos = content.rfind('\n', limit, end)
+        if newline_pos == -1 and limit > 0:
+            break  # 查找范围内的第一行可能不完整
+        line = content[newline_pos + 1:end]
+        stripped = line.strip()
+        # 跳过空行，可选跳过分隔线
+        if stripped and not (skip_separators and stripped.startswith(('=', '-'))):
+            recent_lines.append(line)
+        if newline_pos == -1:
+            break
+        end = newline_pos
+    return recent_lines
+
+def count_non_empty_log_lines(log_name, content):
+    """统计日志中的有效（非空）行数；日志只是追加增长时只统计新增的完整行"""
+    cached = _LOG_LINE_COUNTS.get(log_name)
+    if (cached and len(content) >= cached["end"]
+            and content[:LOG_HEAD_CHECK_SIZE] == cached["head"]
+            and content[max(0, cached["end"] - LOG_HEAD_CHECK_SIZE):cached["end"]] == cached["edge"]):
+        start, total = cached["end"], cached["count"]
+    else:
+        start, total = 0, 0
+    
+    # 只统计到最后一个换行符为止的完整行，末尾未写完的行每次单独判断
+    last_newline = content.rfind('\n', start)
+    end = last_newline + 1 if last_newline != -1 else start
+    total += sum(1 for line in content[start:end].split('\n') if line.strip())
+    
+    _LOG_LINE_COUNTS[log_name] = {
+        "end": end,
+        "count": total,
+        "head": content[:LOG_HEAD_CHECK_SIZE],
+        "edge": content[max(0, end - LOG_HEAD_CHECK_SIZE):end]
+    }
+    return total + (1 if content[end:].strip() else 0)
+
 def clear_output():
     """清空输出"""
     try:
@@ -1001,30 +1504,23 @@ def find_and_move_cvimodel(transfer_dir, conversion_name, selected_model_name):
         # 从模型文件名中提取基本名称（例如：best.pt -> best）
         model_base_name = os.path.splitext(os.path.basename(selected_model_name))[0]
         
-        # 查找workspace目录
+        # 一次遍历workspace目录查找.cvimodel文件（目录不存在时scandir直接报错，无需预先检查）
         workspace_dir = os.path.join(transfer_dir, "workspace")
-        if not os.path.exists(workspace_dir):
+        try:
+            with os.scandir(workspace_dir) as entries:
+                cvimodel_files = [entry.name for entry in entries
+                                  if entry.name.endswith('.cvimodel') and entry.is_file()]
+        except FileNotFoundError:
             return None, None, None, None, "未找到workspace目录"
         
-        # 查找.cvimodel文件
-        cvimodel_files = []
-        for file in os.listdir(workspace_dir):
-            if file.endswith('.cvimodel'):
-                cvimodel_files.append(file)
-        
         if not cvimodel_files:
             return None, None, None, None, "未找到.cvimodel文件"
         
-        # 寻找匹配的文件（优先查找包含模型基本名称的文件）
-        target_cvimodel = None
-        for file in cvimodel_files:
-            if model_base_name in file:
-                target_cvimodel = file
-                break
-        
+        # 寻找匹配的文件（优先查找包含模型基本名称的INT8模型，其次是包含模型基本名称的文件）
         # 如果没有找到匹配的，使用第一个
-        if not target_cvimodel:
-            target_cvimodel = cvimodel_files[0]
+        matched_files = [file for file in cvimodel_files if model_base_name in file]
+        target_cvimodel = next((file for file in matched_files if file.endswith('_int8.cvimodel')),
+                               matched_files[0] if matched_files else cvimodel_files[0])
         
         # 构造新的文件名：export_时间戳_int8.cvimodel
         new_filename = f"{conversion_name}_int8.cvimodel"
@@ -1100,62 +1596,152 @@ def find_and_move_cvimodel(transfer_dir, conversion_name, selected_model_name):
 
 # ==================== Docker命令构建函数 ====================
 
-def build_docker_training_command(model, epochs, imgsz, run_name):
-    """构建Docker训练命令"""
-    # 获取当前目录的绝对路径
-    current_dir = os.getcwd()
-    data_path = os.path.join(current_dir, "data")
-    models_path = os.path.join(current_dir, "models")
-    outputs_path = os.path.join(current_dir, "outputs")
-    
-    # 确保目录存在
-    for path in [data_path, models_path, outputs_path]:
-        create_directory_safe(path)
-    
-    # 转换为Docker挂载格式
-    docker_data_path = normalize_path_for_docker(data_path)
-    docker_models_path = normalize_path_for_docker(models_path)
-    docker_outputs_path = normalize_path_for_docker(outputs_path)
-    
-    # 构建Docker命令
-    docker_command = f'''docker run --gpus all --name yolov11-{run_name} --rm --shm-size=4g -v "{docker_data_path}:/workspace/data" -v "{docker_models_path}:/workspace/models" -v "{docker_outputs_path}:/workspace/outputs" lintheyoung/yolov11-trainer:latest bash -c "cd /workspace/models && yolo train data=/workspace/data/data.yaml model={model} epochs={epochs} imgsz={imgsz} project=/workspace/outputs name={run_name}"'''
+def format_command(cmd):
+    """把命令参数列表格式化为可复制到终端执行的字符串，用于日志和界面显示"""
+    if isinstance(cmd, str):
+        return cmd
+    if IS_WINDOWS:
+        return subprocess.list2cmdline(cmd)
+    return shlex.join(cmd)
+
+# 工作目录路径缓存: 绝对路径、Docker挂载路径，以及目录是否已创建
+_WORKSPACE_PATHS = get_shared_cache("workspace_paths")
+
+def get_workspace_paths(ensure_dirs=True):
+    """获取data/models/outputs目录的绝对路径和Docker挂载路径；ensure_dirs为True时确保目录存在（每个进程只创建一次）"""
+    if "data" not in _WORKSPACE_PATHS:
+        # 程序不会切换工作目录，路径只需计算一次
+        current_dir = os.getcwd()
+        paths = {name: os.path.join(current_dir, name) for name in ("data", "models", "outputs")}
+        paths["docker_mounts"] = tuple(normalize_path_for_docker(paths[name]) for name in ("data", "models", "outputs"))
+        _WORKSPACE_PATHS.update(paths)
+    
+    if ensure_dirs and not _WORKSPACE_PATHS.get("dirs_created"):
+        for name in ("data", "models", "outputs"):
+            create_directory_safe(_WORKSPACE_PATHS[name])
+        _WORKSPACE_PATHS["dirs_created"] = True
+    
+    return _WORKSPACE_PATHS
+
+def build_docker_training_command(model, epochs, imgsz, run_name, ensure_dirs=True):
+    """构建Docker训练命令；ensure_dirs为False时只生成命令（用于界面预览），不创建目录"""
+    # 工作目录及其Docker挂载路径（程序运行期间不变，只计算一次）
+    paths = get_workspace_paths(ensure_dirs)
+    data_path, models_path, outputs_path = paths["data"], paths["models"], paths["outputs"]
+    docker_data_path, docker_models_path, docker_outputs_path = paths["docker_mounts"]
+    
+    # 构建Docker命令（参数列表，不经过shell启动）
+    docker_command = [
+        'docker', 'run', '--gpus', 'all', '--name', f'yolov11-{run_name}', '--rm', '--shm-size=4g',
+        '-v', f'{docker_data_path}:/workspace/data',
+        '-v', f'{docker_models_path}:/workspace/models',
+        '-v', f'{docker_outputs_path}:/workspace/outputs',
+        'lintheyoung/yolov11-trainer:latest',
+        'bash', '-c', f'cd /workspace/models && yolo train data=/workspace/data/data.yaml model={model} epochs={epochs} imgsz={imgsz} project=/workspace/outputs name={run_name}'
+    ]
     
     return docker_command, data_path, models_path, outputs_path
 
 def build_docker_conversion_command(model_path, format, imgsz_height, imgsz_width, opset, conversion_name):
     """构建Docker转换命令"""
-    # 获取当前目录的绝对路径
-    current_dir = os.getcwd()
-    data_path = os.path.join(current_dir, "data")
-    models_path = os.path.join(current_dir, "models")
-    outputs_path = os.path.join(current_dir, "outputs")
-    
-    # 确保目录存在
-    for path in [data_path, models_path, outputs_path]:
-        create_directory_safe(path)
-    
-    # 转换模型路径为Docker容器内路径
-    docker_model_path = model_path.replace(outputs_path, "/workspace/outputs")
-    docker_model_path = docker_model_path.replace(os.sep, "/")
+    # 工作目录及其Docker挂载路径（程序运行期间不变，只计算一次）
+    paths = get_workspace_paths()
+    docker_data_path, docker_models_path, docker_outputs_path = paths["docker_mounts"]
     
-    # 转换为Docker挂载格式
-    docker_data_path = normalize_path_for_docker(data_path)
-    docker_models_path = normalize_path_for_docker(models_path)
-    docker_outputs_path = normalize_path_for_docker(outputs_path)
-    
-    # 构建Docker命令
-    docker_command = f'''docker run --gpus all --name yolo-export-{conversion_name} --rm --shm-size=4g -v "{docker_data_path}:/workspace/data" -v "{docker_models_path}:/workspace/models" -v "{docker_outputs_path}:/workspace/outputs" lintheyoung/yolov11-trainer:latest bash -c "yolo export model={docker_model_path} format={format} imgsz={imgsz_height},{imgsz_width} opset={opset} batch=1"'''
+    # 转换模型路径为Docker容器内路径：按相对outputs目录的路径拼接，兼容相对路径（如./outputs/...）
+    try:
+        relative_model_path = os.path.relpath(os.path.abspath(model_path), paths["outputs"])
+    except ValueError:
+        relative_model_path = os.pardir  # Windows下位于不同盘符
+    if relative_model_path.startswith(os.pardir):
+        # 模型不在outputs目录下，保持原有的字符串替换方式
+        docker_model_path = model_path.replace(paths["outputs"], "/workspace/outputs").replace(os.sep, "/")
+    else:
+        docker_model_path = f"/workspace/outputs/{Path(relative_model_path).as_posix()}"
+    
+    # 构建Docker命令（参数列表，不经过shell启动）
+    docker_command = [
+        'docker', 'run', '--gpus', 'all', '--name', f'yolo-export-{conversion_name}', '--rm', '--shm-size=4g',
+        '-v', f'{docker_data_path}:/workspace/data',
+        '-v', f'{docker_models_path}:/workspace/models',
+        '-v', f'{docker_outputs_path}:/workspace/outputs',
+        'lintheyoung/yolov11-trainer:latest',
+        'bash', '-c', f'yolo export model={docker_model_path} format={format} imgsz={imgsz_height},{imgsz_width} opset={opset} batch=1'
+    ]
     
     return docker_command
 
-def build_docker_cvimodel_command(transfer_dir):
-    """构建CviModel转换命令"""
+def get_cvimodel_container_name(docker_transfer_path):
+    """常驻转换容器的名称：按transfer目录区分，同一台机器上的多个程序副本互不影响"""
+    path_hash = hashlib.sha1(docker_transfer_path.encode('utf-8')).hexdigest()[:12]
+    return f"{CVIMODEL_CONTAINER_PREFIX}-{path_hash}"
+
+def ensure_cvimodel_container(transfer_root="transfer"):
+    """确保常驻的CviModel转换容器正在运行，返回容器名称；不可用时返回None"""
+    docker_transfer_path = normalize_path_for_docker(os.path.abspath(transfer_root))
+    container_name = get_cvimodel_container_name(docker_transfer_path)
+    
+    # 检查容器是否已在运行，且挂载的是当前的transfer目录
+    result = run_subprocess_safe([
+        'docker', 'inspect', '-f',
+        f'{{{{.State.Running}}}} {{{{index .Config.Labels "{CVIMODEL_CONTAINER_LABEL}"}}}}',
+        container_name
+    ])
+    if result is not None and result.returncode == 0:
+        running, _, mounted_path = result.stdout.strip().partition(' ')
+        if running == 'true' and mounted_path == docker_transfer_path:
+            register_cvimodel_container(container_name)
+            return container_name
+        # 容器已停止或挂载目录不一致，删除后重新创建
+        run_subprocess_safe(['docker', 'rm', '-f', container_name], timeout=60)
+    
+    result = run_subprocess_safe([
+        'docker', 'run', '-d',
+        '--name', container_name,
+        '--label', f'{CVIMODEL_CONTAINER_LABEL}={docker_transfer_path}',
+        '-v', f'{docker_transfer_path}:/workspace',
+        'lintheyoung/tpuc_dev_env_build', 'sleep', 'infinity'
+    ], timeout=120)
+    if result is None or result.returncode != 0:
+        return None
+    register_cvimodel_container(container_name)
+    return container_name
+
+def register_cvimodel_container(container_name):
+    """记录本进程使用的常驻转换容器，程序退出时统一删除"""
+    _CVIMODEL_CONTAINERS.setdefault("names", set()).add(container_name)
+    # 脚本每次重新运行都会重新定义函数，退出清理只注册一次
+    if not _CVIMODEL_CONTAINERS.get("atexit_registered"):
+        atexit.register(remove_cvimodel_containers)
+        _CVIMODEL_CONTAINERS["atexit_registered"] = True
+
+def remove_cvimodel_containers():
+    """程序退出时删除本进程使用过的常驻转换容器"""
+    for container_name in _CVIMODEL_CONTAINERS.get("names", ()):
+        remove_cvimodel_container(container_name)
+
+def remove_cvimodel_container(container_name):
+    """删除常驻的CviModel转换容器（同时终止容器内正在执行的转换）"""
+    result = run_subprocess_safe(['docker', 'rm', '-f', container_name], timeout=60)
+    return result is not None and result.returncode == 0
+
+def build_docker_cvimodel_command(transfer_dir, container_name=None):
+    """构建CviModel转换命令；指定container_name时在该常驻容器中执行"""
+    if container_name:
+        # 在常驻容器中执行，容器的/workspace对应整个transfer目录
+        relative_dir = os.path.relpath(os.path.abspath(transfer_dir), os.path.abspath("transfer"))
+        relative_dir = relative_dir.replace(os.sep, "/")
+        return ['docker', 'exec', container_name, 'bash', '-c', f'cd /workspace/{relative_dir} && ./convert_cvimodel.sh']
+    
     # 获取transfer目录的绝对路径
     abs_transfer_dir = os.path.abspath(transfer_dir)
     docker_transfer_path = normalize_path_for_docker(abs_transfer_dir)
     
-    # 构建Docker命令
-    docker_command = f'''docker run --rm -it -v "{docker_transfer_path}:/workspace" lintheyoung/tpuc_dev_env_build bash -c "cd /workspace && ./convert_cvimodel.sh"'''
+    # 构建Docker命令（输出通过管道读取，不分配终端）
+    docker_command = [
+        'docker', 'run', '--rm', '-v', f'{docker_transfer_path}:/workspace',
+        'lintheyoung/tpuc_dev_env_build', 'bash', '-c', 'cd /workspace && ./convert_cvimodel.sh'
+    ]
     
     return docker_command
 
@@ -1183,8 +1769,7 @@ def run_docker_training(model, epochs, imgsz):
             future_last_pt = os.path.join(future_weights_dir, "last.pt")
             
             # 保存映射关系
-            save_pt_dataset_mapping(future_best_pt, data_path, run_name)
-            save_pt_dataset_mapping(future_last_pt, data_path, run_name)
+            save_pt_dataset_mappings([future_best_pt, future_last_pt], data_path, run_name)
             
             # 启动进程 - 使用安全的subprocess创建函数
             process = create_subprocess_safe(docker_command)
@@ -1198,29 +1783,14 @@ def run_docker_training(model, epochs, imgsz):
             set_status("running", process.pid, run_name)
             
             # 实时读取输出
-            with open(OUTPUT_FILE, 'w', encoding='utf-8', errors='replace') as f:
-                f.write(f"开始执行命令:\n{docker_command}\n\n")
+            with open(OUTPUT_FILE, 'w', encoding='utf-8', errors='replace',
+                      buffering=LOG_WRITE_BUFFER_SIZE) as f:
+                f.write(f"开始执行命令:\n{format_command(docker_command)}\n\n")
                 f.write(f"已建立映射关系:\n")
                 f.write(f"  - {future_best_pt} -> {data_path}\n")
                 f.write(f"  - {future_last_pt} -> {data_path}\n\n")
-                f.flush()
                 
-                for line in iter(process.stdout.readline, ''):
-                    if line:
-                        try:
-                            f.write(line)
-                            f.flush()
-                            # Linux下强制同步到磁盘
-                            if platform.system() == "Linux":
-                                try:
-                                    os.fsync(f.fileno())
-                                except:
-                                    pass
-                        except UnicodeEncodeError:
-                            # 如果遇到编码问题，尝试清理字符
-                            clean_line = line.encode('utf-8', errors='replace').decode('utf-8')
-                            f.write(clean_line)
-                            f.flush()
+                write_process_output(process, f)
             
             # 等待完成
             return_code = process.wait()
@@ -1239,10 +1809,8 @@ def run_docker_training(model, epochs, imgsz):
             with open(OUTPUT_FILE, 'a', encoding='utf-8', errors='replace') as f:
                 f.write(f"\n❌ 执行出错: {str(e)}")
     
-    # 后台线程运行
-    thread = threading.Thread(target=training_task)
-    thread.daemon = True
-    thread.start()
+    # 后台线程运行（守护线程，退出Streamlit时不必等待训练/转换结束）
+    threading.Thread(target=training_task, name="training-task", daemon=True).start()
 
 def run_model_conversion(model_path, format="onnx", opset=18):
     """运行模型转换"""
@@ -1274,13 +1842,11 @@ def run_model_conversion(model_path, format="onnx", opset=18):
                 f.write(f"查找路径: {model_path}\n")
                 f.write(f"绝对路径: {os.path.abspath(model_path)}\n")
                 
-                # 显示所有映射关系
+                # 显示所有映射关系（复用已缓存的映射解析结果，一次写入）
                 if os.path.exists(MAPPING_FILE):
-                    with open(MAPPING_FILE, 'r', encoding='utf-8') as map_f:
-                        all_mappings = json.load(map_f)
-                        f.write(f"映射文件中共有 {len(all_mappings)} 条记录:\n")
-                        for key in all_mappings.keys():
-                            f.write(f"  - {key}\n")
+                    all_mappings, _ = load_pt_dataset_mapping()
+                    f.write(f"映射文件中共有 {len(all_mappings)} 条记录:\n")
+                    f.write("".join(f"  - {key}\n" for key in all_mappings))
                 else:
                     f.write("映射文件不存在\n")
                 
@@ -1297,16 +1863,15 @@ def run_model_conversion(model_path, format="onnx", opset=18):
                     # 收集图片 - 使用新的函数调用方式
                     f.write("正在收集图片...\n")
                     f.flush()
-                    all_images = collect_images_from_dataset(
+                    all_images, total_images = collect_images_from_dataset(
                         mapping_info['images_path'], 
                         target_count=200
                     )
                     
-                    f.write(f"找到 {len(all_images)} 张图片\n")
-                    f.flush()
+                    f.write(f"找到 {total_images} 张图片\n")
                     
                     if all_images:
-                        # 复制图片
+                        # 复制图片（与上面的统计信息一起刷新）
                         f.write("正在复制图片到transfer目录...\n")
                         f.flush()
                         copied_images, test_image = copy_images_to_transfer(all_images, transfer_dir, 200)
@@ -1349,31 +1914,18 @@ def run_model_conversion(model_path, format="onnx", opset=18):
             set_status("converting", process.pid, conversion_name)
             
             # 实时读取输出
-            with open(CONVERSION_OUTPUT_FILE, 'a', encoding='utf-8', errors='replace') as f:
-                f.write(f"执行转换命令:\n{docker_command}\n\n")
-                f.flush()
+            with open(CONVERSION_OUTPUT_FILE, 'a', encoding='utf-8', errors='replace',
+                      buffering=LOG_WRITE_BUFFER_SIZE) as f:
+                f.write(f"执行转换命令:\n{format_command(docker_command)}\n\n")
                 
-                for line in iter(process.stdout.readline, ''):
-                    if line:
-                        try:
-                            f.write(line)
-                            f.flush()
-                            # Linux下强制同步到磁盘
-                            if platform.system() == "Linux":
-                                try:
-                                    os.fsync(f.fileno())
-                                except:
-                                    pass
-                        except UnicodeEncodeError:
-                            clean_line = line.encode('utf-8', errors='replace').decode('utf-8')
-                            f.write(clean_line)
-                            f.flush()
+                write_process_output(process, f)
             
             # 等待完成
             return_code = process.wait()
             
             # 转换完成后，复制ONNX模型到transfer目录
-            with open(CONVERSION_OUTPUT_FILE, 'a', encoding='utf-8', errors='replace') as f:
+            with open(CONVERSION_OUTPUT_FILE, 'a', encoding='utf-8', errors='replace',
+                      buffering=LOG_WRITE_BUFFER_SIZE) as f:
                 if return_code == 0:
                     f.write("\n=== ONNX转换成功，复制模型文件 ===\n")
                     
@@ -1390,7 +1942,8 @@ def run_model_conversion(model_path, format="onnx", opset=18):
                     if onnx_files:
                         for onnx_file in onnx_files:
                             target_onnx = os.path.join(transfer_dir, os.path.basename(onnx_file))
-                            shutil.copy2(onnx_file, target_onnx)
+                            # 转换只读取ONNX模型，同一文件系统下直接硬链接，无需复制数据
+                            link_or_copy_file(onnx_file, target_onnx)
                             f.write(f"已复制ONNX模型: {os.path.basename(onnx_file)}\n")
                         
                         f.write(f"\n✅ ONNX转换和文件复制完成: {transfer_dir}\n")
@@ -1402,7 +1955,9 @@ def run_model_conversion(model_path, format="onnx", opset=18):
                         convert_script_path = "convert_cvimodel.sh"
                         if os.path.exists(convert_script_path):
                             target_script_path = os.path.join(transfer_dir, "convert_cvimodel.sh")
-                            shutil.copy2(convert_script_path, target_script_path)
+                            # 脚本随后要改为可执行权限，不能与仓库中的文件共用硬链接；
+                            # 元数据也无需保留，copyfile省去copystat
+                            shutil.copyfile(convert_script_path, target_script_path)
                             
                             # 设置执行权限
                             safe_chmod(target_script_path, 0o755)
@@ -1415,42 +1970,43 @@ def run_model_conversion(model_path, format="onnx", opset=18):
                             f.write(f"切换到目录: {transfer_dir}\n")
                             f.flush()
                             
+                            # 优先复用常驻容器，避免每次转换都启动新容器
+                            container_name = ensure_cvimodel_container()
+                            if container_name:
+                                f.write(f"复用常驻转换容器: {container_name}\n")
+                            else:
+                                f.write("⚠️ 常驻转换容器不可用，使用一次性容器执行转换\n")
+                            
                             # 构建docker命令
-                            cvi_docker_command = build_docker_cvimodel_command(transfer_dir)
+                            cvi_docker_command = build_docker_cvimodel_command(
+                                transfer_dir, container_name=container_name
+                            )
                             
-                            f.write(f"执行命令:\n{cvi_docker_command}\n\n")
+                            f.write(f"执行命令:\n{format_command(cvi_docker_command)}\n\n")
                             f.flush()
                             
                             # 启动CviModel转换进程 - 使用安全的subprocess创建函数
-                            cvi_process = create_subprocess_safe(cvi_docker_command, cwd=os.path.abspath(transfer_dir))
+                            # docker命令中的挂载路径都是绝对路径，无需设置cwd（设置cwd时subprocess无法使用posix_spawn）
+                            cvi_process = create_subprocess_safe(cvi_docker_command)
                             
                             if cvi_process is None:
                                 f.write("❌ 无法启动CviModel转换进程\n")
                                 f.write("ONNX模型仍可正常使用\n")
                             else:
+                                # 停止转换时终止CviModel转换进程；在常驻容器中执行时还需删除容器
+                                set_status("converting", cvi_process.pid, conversion_name)
+                                if container_name:
+                                    _CVIMODEL_CONTAINERS["exec"] = (cvi_process.pid, container_name)
+                                
                                 # 实时读取CviModel转换输出
                                 f.write("CviModel转换输出:\n")
                                 f.write("-" * 50 + "\n")
-                                f.flush()
                                 
-                                for line in iter(cvi_process.stdout.readline, ''):
-                                    if line:
-                                        try:
-                                            f.write(line)
-                                            f.flush()
-                                            # Linux下强制同步到磁盘
-                                            if platform.system() == "Linux":
-                                                try:
-                                                    os.fsync(f.fileno())
-                                                except:
-                                                    pass
-                                        except UnicodeEncodeError:
-                                            clean_line = line.encode('utf-8', errors='replace').decode('utf-8')
-                                            f.write(clean_line)
-                                            f.flush()
+                                write_process_output(cvi_process, f)
                                 
                                 # 等待CviModel转换完成
                                 cvi_return_code = cvi_process.wait()
+                                _CVIMODEL_CONTAINERS.pop("exec", None)
                                 
                                 f.write("-" * 50 + "\n")
                                 if cvi_return_code == 0:
@@ -1503,6 +2059,9 @@ def run_model_conversion(model_path, format="onnx", opset=18):
                                         final_zip_filename = os.path.basename(zip_file_path)
                                         f.write(f"  - {final_zip_filename} (完整模型包) 📦\n")
                                     
+                                    # 打包结果写出后立即刷新到日志文件，下一次定时刷新即可显示，不必等到任务结束
+                                    f.flush()
+                                    
                                 else:
                                     f.write(f"❌ CviModel转换失败，退出码: {cvi_return_code}\n")
                                     f.write("ONNX模型仍可正常使用\n")
@@ -1525,10 +2084,8 @@ def run_model_conversion(model_path, format="onnx", opset=18):
             with open(CONVERSION_OUTPUT_FILE, 'a', encoding='utf-8', errors='replace') as f:
                 f.write(f"\n❌ 执行出错: {str(e)}")
     
-    # 后台线程运行
-    thread = threading.Thread(target=conversion_task)
-    thread.daemon = True
-    thread.start()
+    # 后台线程运行（守护线程，退出Streamlit时不必等待训练/转换结束）
+    threading.Thread(target=conversion_task, name="conversion-task", daemon=True).start()
 
 def stop_training():
     """停止训练"""
@@ -1557,6 +2114,10 @@ def stop_conversion():
     if pid:
         try:
             success = terminate_process_cross_platform(pid)
+            # docker exec不会把终止信号转发给容器内的进程，正在常驻容器中转换时删除容器以终止CviModel转换
+            exec_pid, container_name = _CVIMODEL_CONTAINERS.get("exec", (None, None))
+            if pid == exec_pid:
+                remove_cvimodel_container(container_name)
             set_status("stopped")
             with open(CONVERSION_OUTPUT_FILE, 'a', encoding='utf-8', errors='replace') as f:
                 if success:
@@ -1570,9 +2131,22 @@ def stop_conversion():
 
 # ==================== 信息提取和显示函数 ====================
 
+# 训练日志中的epoch进度，例如 "Epoch 3/20"
+EPOCH_PROGRESS_PATTERN = re.compile(r'Epoch\s*(\d+)/(\d+)(?!\S)')
+TRAINING_INFO_TAIL_CHARS = 8192  # 只在日志末尾这么多字符内查找最新的训练信息
+
+# 训练信息缓存: 日志长度、日志末尾片段及提取结果，日志未变化时直接返回上次的结果
+_TRAINING_INFO_CACHE = get_shared_cache("training_info")
+
 def extract_training_info(output_content):
     """提取训练关键信息"""
-    lines = output_content.split('\n')
+    # 日志没有新增内容时直接返回上次的结果
+    cache_key = (len(output_content), output_content[-LOG_HEAD_CHECK_SIZE:])
+    if _TRAINING_INFO_CACHE.get("key") == cache_key:
+        return _TRAINING_INFO_CACHE["info"]
+    
+    # 只从日志末尾部分切出最后20行，避免长时间训练后每次刷新都切分整个日志
+    lines = output_content[-TRAINING_INFO_TAIL_CHARS:].rsplit('\n', 20)
     info = {
         "current_epoch": None,
         "total_epochs": None,
@@ -1583,17 +2157,14 @@ def extract_training_info(output_content):
     # 从最新的几行中提取信息
     for line in reversed(lines[-20:]):
         # 提取epoch信息
-        if "Epoch" in line and "/" in line:
-            try:
-                epoch_part = line.split("Epoch")[1].split()[0]
-                if "/" in epoch_part:
-                    current, total = epoch_part.split("/")
-                    info["current_epoch"] = int(current)
-                    info["total_epochs"] = int(total)
-                    info["progress_percentage"] = (int(current) / int(total)) * 100
-                    break
-            except:
-                pass
+        if "Epoch" in line:
+            match = EPOCH_PROGRESS_PATTERN.search(line)
+            if match and int(match.group(2)) > 0:
+                current, total = int(match.group(1)), int(match.group(2))
+                info["current_epoch"] = current
+                info["total_epochs"] = total
+                info["progress_percentage"] = (current / total) * 100
+                break
     
     # 提取最新的指标信息
     for line in reversed(lines[-10:]):
@@ -1601,29 +2172,120 @@ def extract_training_info(output_content):
             info["latest_metrics"] = line.strip()
             break
     
+    _TRAINING_INFO_CACHE["info"] = info
+    _TRAINING_INFO_CACHE["key"] = cache_key
     return info
 
+def directories_unchanged(dir_mtimes):
+    """检查记录的各目录修改时间是否都未变化"""
+    for dir_path, mtime_ns in dir_mtimes.items():
+        try:
+            if os.stat(dir_path).st_mtime_ns != mtime_ns:
+                return False
+        except OSError:
+            return False
+    return True
+
+def scan_leaf_directory(leaf_path, file_names=None, file_suffix=None):
+    """扫描单个目录中匹配的文件，返回(目录修改时间, [(文件名, 路径, stat结果)])，目录不存在时返回None"""
+    try:
+        mtime_ns = os.stat(leaf_path).st_mtime_ns
+        matched = []
+        with os.scandir(leaf_path) as entries:
+            for entry in entries:
+                if file_names is not None and entry.name not in file_names:
+                    continue
+                if file_suffix is not None and not entry.name.endswith(file_suffix):
+                    continue
+                if entry.is_file():
+                    matched.append((entry.name, entry.path, entry.stat()))
+        return mtime_ns, matched
+    except OSError:
+        return None  # 子目录不存在或不是目录
+
+def clear_scan_cache():
+    """清空目录扫描缓存，下次查找时重新扫描（用于手动刷新）"""
+    _SCAN_CACHE.clear()
+
+def list_directory_entries(dir_path):
+    """列出目录内容，返回[(名称, 是否为目录, 文件大小, 修改时间)]，按目录修改时间缓存（最长SCAN_CACHE_TTL秒）；目录不存在时返回空列表"""
+    cache_key = ("listing", os.path.abspath(dir_path))
+    try:
+        mtime_ns = os.stat(dir_path).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    cached = _SCAN_CACHE.get(cache_key)
+    if (cached and cached["mtime_ns"] == mtime_ns
+            and time.monotonic() - cached["scan_time"] < SCAN_CACHE_TTL):
+        return cached["entries"]
+    
+    entries = []
+    with os.scandir(dir_path) as it:
+        for entry in it:
+            is_dir = entry.is_dir()
+            stat_result = entry.stat()
+            entries.append((entry.name, is_dir, 0 if is_dir else stat_result.st_size, stat_result.st_mtime))
+    
+    _SCAN_CACHE[cache_key] = {"scan_time": time.monotonic(), "mtime_ns": mtime_ns, "entries": entries}
+    return entries
+
+def scan_subdirectory_files(root_dir, subdir_prefix="", leaf_subdir="", file_names=None, file_suffix=None):
+    """扫描root_dir下各子目录（或子目录中的leaf_subdir）里的文件，返回[(子目录名, 文件名, 路径, stat结果)]
+    
+    文件按file_names精确匹配或按file_suffix后缀（可以是后缀元组）匹配。结果按扫描过的目录修改时间缓存，
+    目录均未变化且缓存未超过SCAN_CACHE_TTL秒时直接返回缓存，避免每次页面刷新都重新扫描
+    """
+    cache_key = (os.path.abspath(root_dir), subdir_prefix, leaf_subdir, file_names, file_suffix)
+    cached = _SCAN_CACHE.get(cache_key)
+    if (cached and time.monotonic() - cached["scan_time"] < SCAN_CACHE_TTL
+            and directories_unchanged(cached["dir_mtimes"])):
+        return cached["files"]
+    
+    dir_mtimes = {}
+    files = []
+    try:
+        dir_mtimes[root_dir] = os.stat(root_dir).st_mtime_ns
+        with os.scandir(root_dir) as subdirs:
+            subdir_entries = [entry for entry in subdirs
+                              if entry.name.startswith(subdir_prefix) and entry.is_dir()]
+    except OSError:
+        subdir_entries = []
+    
+    leaf_paths = [os.path.join(subdir.path, leaf_subdir) if leaf_subdir else subdir.path
+                  for subdir in subdir_entries]
+    scan_leaf = lambda leaf_path: scan_leaf_directory(leaf_path, file_names, file_suffix)
+    
+    # 子目录较多时并发扫描，各目录的stat/scandir延迟可以重叠
+    if len(leaf_paths) >= SCAN_PARALLEL_MIN_DIRS:
+        with ThreadPoolExecutor(max_workers=min(SCAN_WORKERS, len(leaf_paths))) as executor:
+            scan_results = list(executor.map(scan_leaf, leaf_paths))
+    else:
+        scan_results = [scan_leaf(leaf_path) for leaf_path in leaf_paths]
+    
+    for subdir, leaf_path, scan_result in zip(subdir_entries, leaf_paths, scan_results):
+        if scan_result is None:
+            continue
+        dir_mtimes[leaf_path], matched = scan_result
+        files.extend((subdir.name, name, path, stat_result) for name, path, stat_result in matched)
+    
+    _SCAN_CACHE[cache_key] = {"scan_time": time.monotonic(), "dir_mtimes": dir_mtimes, "files": files}
+    return files
+
 def find_training_models():
     """查找训练产生的模型文件"""
     models = []
-    outputs_dir = "./outputs"
-    
-    if os.path.exists(outputs_dir):
-        for train_dir in os.listdir(outputs_dir):
-            weights_dir = os.path.join(outputs_dir, train_dir, "weights")
-            if os.path.isdir(weights_dir):
-                # 查找best.pt和last.pt文件
-                for weight_file in ["best.pt", "last.pt"]:
-                    weight_path = os.path.join(weights_dir, weight_file)
-                    if os.path.exists(weight_path):
-                        # 添加模型信息
-                        model_info = {
-                            "name": f"{train_dir}/{weight_file}",
-                            "path": weight_path,
-                            "size": os.path.getsize(weight_path) / (1024 * 1024),  # MB
-                            "time": datetime.fromtimestamp(os.path.getmtime(weight_path))
-                        }
-                        models.append(model_info)
+    
+    # 查找各训练目录weights下的best.pt和last.pt文件
+    for train_dir, weight_file, weight_path, stat_result in scan_subdirectory_files(
+            "./outputs", leaf_subdir="weights", file_names=("best.pt", "last.pt")):
+        # 添加模型信息
+        model_info = {
+            "name": f"{train_dir}/{weight_file}",
+            "path": weight_path,
+            "size": stat_result.st_size / (1024 * 1024),  # MB
+            "time": datetime.fromtimestamp(stat_result.st_mtime)
+        }
+        models.append(model_info)
     
     # 按修改时间排序，最新的在前面
     models.sort(key=lambda x: x["time"], reverse=True)
@@ -1632,61 +2294,144 @@ def find_training_models():
 def find_converted_cvimodels():
     """查找转换完成的.cvimodel文件"""
     cvimodels = []
-    transfer_dir = "transfer"
-    
-    if os.path.exists(transfer_dir):
-        for export_dir in os.listdir(transfer_dir):
-            if export_dir.startswith('export_'):
-                export_path = os.path.join(transfer_dir, export_dir)
-                if os.path.isdir(export_path):
-                    # 查找.cvimodel文件
-                    for file in os.listdir(export_path):
-                        if file.endswith('.cvimodel'):
-                            cvimodel_path = os.path.join(export_path, file)
-                            if os.path.isfile(cvimodel_path):
-                                # 添加模型信息
-                                cvimodel_info = {
-                                    "name": file,
-                                    "path": cvimodel_path,
-                                    "size": os.path.getsize(cvimodel_path) / (1024 * 1024),  # MB
-                                    "time": datetime.fromtimestamp(os.path.getmtime(cvimodel_path)),
-                                    "export_dir": export_dir
-                                }
-                                cvimodels.append(cvimodel_info)
+    
+    # 与find_model_packages共用同一次扫描结果
+    for export_dir, file, cvimodel_path, stat_result in scan_subdirectory_files(
+            "transfer", subdir_prefix="export_", file_suffix=EXPORT_SCAN_SUFFIXES):
+        if not file.endswith(".cvimodel"):
+            continue
+        # 添加模型信息
+        cvimodel_info = {
+            "name": file,
+            "path": cvimodel_path,
+            "size": stat_result.st_size / (1024 * 1024),  # MB
+            "time": datetime.fromtimestamp(stat_result.st_mtime),
+            "export_dir": export_dir
+        }
+        cvimodels.append(cvimodel_info)
     
     # 按修改时间排序，最新的在前面
     cvimodels.sort(key=lambda x: x["time"], reverse=True)
     return cvimodels
 
+def get_zip_namelist(zip_path):
+    """获取ZIP包内的文件列表，按文件修改时间和大小缓存，重复查看时不必重新读取中央目录"""
+    stat_result = os.stat(zip_path)
+    cache_key = (stat_result.st_mtime_ns, stat_result.st_size)
+    cached = _ZIP_NAMES_CACHE.get(zip_path)
+    if cached and cached[0] == cache_key:
+        return cached[1]
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        file_list = zip_ref.namelist()
+    _ZIP_NAMES_CACHE[zip_path] = (cache_key, file_list)
+    return file_list
+
+def show_download_button(file_path, key, **kwargs):
+    """显示文件下载按钮；超过DOWNLOAD_EAGER_MAX_BYTES的文件先显示"准备下载"按钮，
+    点击后才读取文件，避免每次页面刷新都读取并向前端注册所有大文件"""
+    prepared_paths = st.session_state.setdefault("prepared_download_paths", set())
+    if file_path not in prepared_paths and os.path.getsize(file_path) > DOWNLOAD_EAGER_MAX_BYTES:
+        if not st.button("⏳ 准备下载", key=f"prepare_{key}", type=kwargs.get("type", "secondary")):
+            return
+        prepared_paths.add(file_path)
+    
+    # 直接把文件交给download_button读取，不在进程内保留文件内容
+    with open(file_path, "rb") as file:
+        st.download_button(
+            data=file,
+            key=key,
+            on_click="ignore",  # 下载不触发页面重新运行
+            **kwargs
+        )
+
 def find_model_packages():
     """查找模型包ZIP文件"""
     packages = []
-    transfer_dir = "transfer"
-    
-    if os.path.exists(transfer_dir):
-        for export_dir in os.listdir(transfer_dir):
-            if export_dir.startswith('export_'):
-                export_path = os.path.join(transfer_dir, export_dir)
-                if os.path.isdir(export_path):
-                    # 查找ZIP文件
-                    for file in os.listdir(export_path):
-                        if file.endswith('.zip') and '_int8.zip' in file:
-                            zip_path = os.path.join(export_path, file)
-                            if os.path.isfile(zip_path):
-                                # 添加包信息
-                                package_info = {
-                                    "name": file,
-                                    "path": zip_path,
-                                    "size": os.path.getsize(zip_path) / (1024 * 1024),  # MB
-                                    "time": datetime.fromtimestamp(os.path.getmtime(zip_path)),
-                                    "export_dir": export_dir
-                                }
-                                packages.append(package_info)
+    
+    # 与find_converted_cvimodels共用同一次扫描结果
+    for export_dir, file, zip_path, stat_result in scan_subdirectory_files(
+            "transfer", subdir_prefix="export_", file_suffix=EXPORT_SCAN_SUFFIXES):
+        if not file.endswith("_int8.zip"):
+            continue
+        # 添加包信息
+        package_info = {
+            "name": file,
+            "path": zip_path,
+            "size": stat_result.st_size / (1024 * 1024),  # MB
+            "time": datetime.fromtimestamp(stat_result.st_mtime),
+            "export_dir": export_dir
+        }
+        packages.append(package_info)
     
     # 按修改时间排序，最新的在前面
     packages.sort(key=lambda x: x["time"], reverse=True)
     return packages
 
+def show_more_results(visible_count):
+    """多显示RESULTS_PAGE_SIZE条转换结果"""
+    st.session_state.conversion_results_visible = visible_count + RESULTS_PAGE_SIZE
+
+def show_load_more_button(total_count, visible_count, key):
+    """转换结果未全部显示时显示"加载更多"按钮，点击后多显示RESULTS_PAGE_SIZE条"""
+    if total_count > visible_count:
+        # 在回调中更新显示数量，点击后的这次重新运行即可显示，无需再调用st.rerun()重新运行整个页面
+        st.button(f"⬇️ 加载更多（还有 {total_count - visible_count} 个）", key=key,
+                  on_click=show_more_results, args=(visible_count,))
+
+def training_output_section():
+    """训练输出区域"""
+    st.subheader("📺 训练输出")
+    current_status = get_status()
+    output_content = read_output()
+    auto_scroll = st.session_state.get("auto_refresh_logs_checkbox", True)
+    if output_content:
+        training_info = extract_training_info(output_content)
+        if training_info["current_epoch"]:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("📊 当前Epoch", f"{training_info['current_epoch']}/{training_info['total_epochs']}")
+            with col2:
+                st.metric("📈 训练进度", f"{training_info['progress_percentage']:.1f}%")
+            with col3:
+                if training_info["latest_metrics"]:
+                    if "mAP50-95" in training_info["latest_metrics"]:
+                        try:
+                            map_value = training_info["latest_metrics"].split()[-1]
+                            st.metric("🎯 mAP50-95", map_value)
+                        except:
+                            st.metric("🎯 最新指标", "计算中...")
+            st.progress(training_info['progress_percentage'] / 100)
+
+        st.markdown("**🔥 最新日志:**")
+        # 最新的在上面
+        recent_content = '\n'.join(get_recent_log_lines(output_content, 10))
+        st.code(recent_content, language=None)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            show_full_log = st.checkbox("显示完整日志", value=False, key="show_full_logs_checkbox")
+        with col2:
+            auto_scroll = st.checkbox("自动刷新", value=True, key="auto_refresh_logs_checkbox")
+
+        if show_full_log:
+            st.markdown("**📋 完整训练日志:**")
+            st.text_area(
+                "所有日志内容:",
+                value=truncate_log_for_display(output_content),
+                height=300,
+                key="full_output_area"
+            )
+
+        total_lines = count_non_empty_log_lines("training", output_content)
+        st.caption(f"📊 总计 {total_lines} 行有效日志 | 🕒 最后更新: {datetime.now().strftime('%H:%M:%S')}")
+    else:
+        st.info("暂无输出内容（可以浏览器刷新一下）")
+
+    # 训练开始/结束或切换自动刷新后，重新运行整个页面以更新fragment的定时刷新设置和其他标签页的状态
+    auto_refresh = current_status["status"] == "running" and auto_scroll
+    if auto_refresh != st.session_state.get("training_output_auto_refresh", False):
+        st.rerun()
+
 def display_results():
     """显示训练结果"""
     # 获取当前运行状态
@@ -1702,17 +2447,17 @@ def display_results():
     # 如果没有当前运行的任务，则寻找最新的结果
     if not current_run and current_status != "completed":
         outputs_dir = "./outputs"
-        if os.path.exists(outputs_dir):
-            # 查找最新的训练结果
+        # 查找最新的训练结果（每个目录只stat一次；目录不存在时直接跳过，无需先检查是否存在）
+        try:
+            with os.scandir(outputs_dir) as entries:
+                train_dirs = [(entry.stat().st_ctime, entry.name) for entry in entries
+                              if entry.name.startswith('train_') and entry.is_dir()]
+        except FileNotFoundError:
             train_dirs = []
-            for item in os.listdir(outputs_dir):
-                item_path = os.path.join(outputs_dir, item)
-                if os.path.isdir(item_path) and item.startswith('train_'):
-                    train_dirs.append(item)
-            
-            if train_dirs:
-                # 按修改时间排序，获取最新的
-                current_run = max(train_dirs, key=lambda x: os.path.getctime(os.path.join(outputs_dir, x)))
+        
+        if train_dirs:
+            # 按修改时间排序，获取最新的
+            current_run = max(train_dirs)[1]
     
     # 如果有当前任务或找到了最新的结果
     if current_run:
@@ -1728,22 +2473,25 @@ def display_results():
             cols = st.columns(2)
             col_idx = 0
             
+            # 一次列出结果目录（缓存），代替逐个文件检查是否存在: 名称 -> 是否为目录
+            result_entries = {name: is_dir for name, is_dir, _, _ in list_directory_entries(results_path)}
+            
             for img_file in image_files:
                 img_path = os.path.join(results_path, img_file)
-                if os.path.exists(img_path):
+                if result_entries.get(img_file) is False:
                     with cols[col_idx % 2]:
                         st.image(img_path, caption=img_file.replace('.png', '').replace('_', ' ').title())
                     col_idx += 1
             
             # 显示权重文件
             weights_dir = os.path.join(results_path, 'weights')
-            if os.path.exists(weights_dir):
+            if result_entries.get('weights'):
                 st.subheader("💾 模型权重")
-                for weight_file in os.listdir(weights_dir):
-                    weight_path = os.path.join(weights_dir, weight_file)
-                    if os.path.isfile(weight_path):
-                        file_size = os.path.getsize(weight_path) / (1024 * 1024)  # MB
-                        st.write(f"📁 {weight_file} ({file_size:.1f} MB)")
+                with os.scandir(weights_dir) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            file_size = entry.stat().st_size / (1024 * 1024)  # MB
+                            st.write(f"📁 {entry.name} ({file_size:.1f} MB)")
         else:
             st.info("暂无训练结果（可以刷新一下）")
     else:
@@ -1837,43 +2585,73 @@ def dataset_management_section():
                     else:
                         st.error(message)
 
-def extract_conversion_info(output_content):
-    """提取转换关键信息"""
-    lines = output_content.split('\n')
-    info = {
-        "current_step": None,
-        "progress_percentage": 0,
-        "latest_status": None,
-        "conversion_name": None,
-        "model_path": None,
-        "images_collected": None,
-        "images_copied": None,
-        "onnx_conversion_status": None,
-        "cvimodel_conversion_status": None,
-        "mud_file_created": None,
-        "script_file_created": None,  # 新增：检测脚本创建状态
-        "zip_package_created": None
-    }
-    
-    # 转换步骤映射
-    steps_map = {
-        "开始模型转换流程": (1, 10),
-        "查找数据集映射关系": (2, 20),
-        "数据集图片收集与复制": (3, 30),
-        "ONNX模型转换": (4, 40),
-        "ONNX转换成功": (5, 60),
-        "复制转换脚本": (6, 70),
-        "执行CviModel转换": (7, 80),
-        "处理CviModel文件": (8, 90),
-        "完整的MaixCam模型包已创建": (9, 100)
-    }
-    
-    # 从日志中提取信息
+FIRST_NUMBER_PATTERN = re.compile(r'\d+')
+
+# 转换信息缓存: 已解析到的位置、该位置之前的解析结果及用于校验的文件头和末尾片段
+_CONVERSION_INFO_CACHE = get_shared_cache("conversion_info")
+
+# 转换步骤映射: 日志中的步骤标题 -> (步骤序号, 进度百分比)
+CONVERSION_STEPS = {
+    "开始模型转换流程": (1, 10),
+    "查找数据集映射关系": (2, 20),
+    "数据集图片收集与复制": (3, 30),
+    "ONNX模型转换": (4, 40),
+    "ONNX转换成功": (5, 60),
+    "复制转换脚本": (6, 70),
+    "执行CviModel转换": (7, 80),
+    "处理CviModel文件": (8, 90),
+    "完整的MaixCam模型包已创建": (9, 100)
+}
+
+# 阶段状态关键字: 日志中的关键字 -> (信息字段, 状态)
+# 失败关键字排在成功之前，同一行同时出现时与原先的判断顺序一致，以成功为准
+CONVERSION_STATUS_KEYWORDS = {
+    "ONNX转换失败": ("onnx_conversion_status", "失败"),
+    "ONNX转换成功": ("onnx_conversion_status", "成功"),
+    "CviModel转换失败": ("cvimodel_conversion_status", "失败"),
+    "CviModel转换完成": ("cvimodel_conversion_status", "成功"),
+    "创建MUD文件失败": ("mud_file_created", "失败"),
+    "成功创建MUD配置文件": ("mud_file_created", "成功"),
+    "创建检测脚本失败": ("script_file_created", "失败"),
+    "成功创建检测脚本": ("script_file_created", "成功"),
+    "创建模型包失败": ("zip_package_created", "失败"),
+    "成功创建模型包": ("zip_package_created", "成功")
+}
+# 步骤和阶段状态关键字合并为一个正则，每行只需扫描一次
+CONVERSION_MARKER_PATTERN = re.compile("|".join(map(re.escape, dict.fromkeys([*CONVERSION_STEPS, *CONVERSION_STATUS_KEYWORDS]))))
+
+# 转换状态摘要中各阶段的显示: (所在列, 信息字段, 标签)
+CONVERSION_STATUS_SUMMARY = (
+    (1, "onnx_conversion_status", "🔄 ONNX"),
+    (2, "cvimodel_conversion_status", "🎯 CviModel"),
+    (3, "mud_file_created", "📋 MUD"),
+    (4, "script_file_created", "🐍 脚本"),
+    (4, "zip_package_created", "📦 ZIP")
+)
+
+def get_latest_status_line(content, max_lines=10):
+    """从末尾向前逐行查找最后max_lines行中最新的一条有内容且不是分隔线的日志，不切分整个日志"""
+    end = len(content)
+    for _ in range(max_lines):
+        start = content.rfind('\n', 0, end) + 1
+        line = content[start:end].strip()
+        if line and not line.startswith("="):
+            return line
+        if start == 0:
+            break
+        end = start - 1
+    return None
+
+def parse_conversion_lines(lines, info):
+    """从转换日志行中提取信息并更新到info中，后面的行覆盖前面的结果"""
     for line in lines:
-        line = line.strip()
+        # 要提取的标记都含有中文，纯ASCII的行（Docker中工具的输出，占日志绝大部分）直接跳过
+        if line.isascii():
+            continue
         
+        # 以下几条日志由本程序写入，标记固定在行首，无需strip整行
         # 提取转换名称
-        if "开始模型转换流程" in line and "export_" in line:
+        if line.startswith("开始模型转换流程") and "export_" in line:
             try:
                 parts = line.split("export_")
                 if len(parts) > 1:
@@ -1882,78 +2660,169 @@ def extract_conversion_info(output_content):
                 pass
         
         # 提取模型路径
-        if "模型文件:" in line:
+        if line.startswith("模型文件:"):
             try:
                 info["model_path"] = line.split("模型文件:")[1].strip()
             except:
                 pass
         
+        # 提取图片收集信息
+        if line.startswith("找到") and "张图片" in line:
+            number = FIRST_NUMBER_PATTERN.search(line)
+            if number:
+                info["images_collected"] = int(number.group())
+        
+        # 提取图片复制信息
+        if line.startswith("成功复制") and "张图片" in line:
+            number = FIRST_NUMBER_PATTERN.search(line)
+            if number:
+                info["images_copied"] = int(number.group())
+        
+        found = CONVERSION_MARKER_PATTERN.findall(line)
+        if not found:
+            continue
+        
         # 检查步骤进度
-        for step_text, (step_num, progress) in steps_map.items():
-            if step_text in line:
+        for step_text, (step_num, progress) in CONVERSION_STEPS.items():
+            if step_text in found:
                 info["current_step"] = step_text
                 info["progress_percentage"] = progress
                 break
         
-        # 提取图片收集信息
-        if "找到" in line and "张图片" in line:
-            try:
-                import re
-                numbers = re.findall(r'\d+', line)
-                if numbers:
-                    info["images_collected"] = int(numbers[0])
-            except:
-                pass
-        
-        # 提取图片复制信息
-        if "成功复制" in line and "张图片" in line:
-            try:
-                import re
-                numbers = re.findall(r'\d+', line)
-                if numbers:
-                    info["images_copied"] = int(numbers[0])
-            except:
-                pass
-        
-        # ONNX转换状态
-        if "ONNX转换成功" in line:
-            info["onnx_conversion_status"] = "成功"
-        elif "ONNX转换失败" in line:
-            info["onnx_conversion_status"] = "失败"
-        
-        # CviModel转换状态
-        if "CviModel转换完成" in line:
-            info["cvimodel_conversion_status"] = "成功"
-        elif "CviModel转换失败" in line:
-            info["cvimodel_conversion_status"] = "失败"
-        
-        # MUD文件创建状态
-        if "成功创建MUD配置文件" in line:
-            info["mud_file_created"] = "成功"
-        elif "创建MUD文件失败" in line:
-            info["mud_file_created"] = "失败"
-        
-        # 检测脚本创建状态
-        if "成功创建检测脚本" in line:
-            info["script_file_created"] = "成功"
-        elif "创建检测脚本失败" in line:
-            info["script_file_created"] = "失败"
-        
-        # ZIP包创建状态
-        if "成功创建模型包" in line:
-            info["zip_package_created"] = "成功"
-        elif "创建模型包失败" in line:
-            info["zip_package_created"] = "失败"
+        # 各阶段的成功/失败状态，按字典顺序应用，同一行同时出现成功和失败时仍以成功为准
+        for keyword, (field, value) in CONVERSION_STATUS_KEYWORDS.items():
+            if keyword in found:
+                info[field] = value
+
+def extract_conversion_info(output_content):
+    """提取转换关键信息；日志只是追加增长时只解析新增的完整行"""
+    cached = _CONVERSION_INFO_CACHE.get("state")
+    if (cached and len(output_content) >= cached["end"]
+            and output_content[:LOG_HEAD_CHECK_SIZE] == cached["head"]
+            and output_content[max(0, cached["end"] - LOG_HEAD_CHECK_SIZE):cached["end"]] == cached["edge"]):
+        start, info = cached["end"], dict(cached["info"])
+    else:
+        info = {
+            "current_step": None,
+            "progress_percentage": 0,
+            "latest_status": None,
+            "conversion_name": None,
+            "model_path": None,
+            "images_collected": None,
+            "images_copied": None,
+            "onnx_conversion_status": None,
+            "cvimodel_conversion_status": None,
+            "mud_file_created": None,
+            "script_file_created": None,  # 新增：检测脚本创建状态
+            "zip_package_created": None
+        }
+        start = 0
+    
+    # 只解析到最后一个换行符为止的完整行并缓存结果，末尾未写完的行每次单独解析
+    last_newline = output_content.rfind('\n', start)
+    end = last_newline + 1 if last_newline != -1 else start
+    parse_conversion_lines(output_content[start:end].split('\n'), info)
+    
+    _CONVERSION_INFO_CACHE["state"] = {
+        "end": end,
+        "info": dict(info),
+        "head": output_content[:LOG_HEAD_CHECK_SIZE],
+        "edge": output_content[max(0, end - LOG_HEAD_CHECK_SIZE):end]
+    }
+    
+    if end < len(output_content):
+        parse_conversion_lines([output_content[end:]], info)
     
     # 提取最新状态
-    for line in reversed(lines[-10:]):
-        line = line.strip()
-        if line and not line.startswith("="):
-            info["latest_status"] = line
-            break
+    info["latest_status"] = get_latest_status_line(output_content)
     
     return info
 
+def conversion_output_section():
+    """转换输出日志区域"""
+    st.markdown("### 📄 转换输出日志")
+    current_status = get_status().get("status")
+    conversion_output = read_conversion_output()
+    auto_refresh_conversion = st.session_state.get("auto_refresh_conversion_logs", True)
+    
+    if conversion_output:
+        # 提取转换关键信息
+        conversion_info = extract_conversion_info(conversion_output)
+        
+        # 显示转换进度摘要
+        if conversion_info["current_step"]:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("🔄 当前步骤", conversion_info["current_step"])
+            with col2:
+                st.metric("📈 转换进度", f"{conversion_info['progress_percentage']:.0f}%")
+            with col3:
+                if conversion_info["conversion_name"]:
+                    st.metric("📦 转换任务", conversion_info["conversion_name"])
+            
+            # 显示进度条
+            st.progress(conversion_info['progress_percentage'] / 100)
+        
+        # 显示转换状态摘要
+        if (conversion_info["images_collected"] or conversion_info["onnx_conversion_status"]
+                or conversion_info["cvimodel_conversion_status"] or conversion_info["mud_file_created"]
+                or conversion_info["script_file_created"]):
+            
+            st.markdown("**🎯 转换状态摘要:**")
+            
+            status_cols = st.columns(5)  # 增加一列用于显示脚本状态
+            
+            with status_cols[0]:
+                if conversion_info["images_collected"]:
+                    st.info(f"📸 图片收集: {conversion_info['images_collected']}张")
+                if conversion_info["images_copied"]:
+                    st.info(f"📋 图片复制: {conversion_info['images_copied']}张")
+            
+            # 各阶段状态：成功显示为绿色，失败显示为红色
+            for column, field, label in CONVERSION_STATUS_SUMMARY:
+                status = conversion_info[field]
+                if status:
+                    with status_cols[column]:
+                        (st.success if status == "成功" else st.error)(f"{label}: {status}")
+        
+        # 显示最新的几行日志（置顶显示）
+        st.markdown("**🔥 最新日志:**")
+        
+        # 过滤掉空行和分隔线，取最后10行有内容的日志，最新的在上面
+        recent_content = '\n'.join(get_recent_log_lines(conversion_output, 10, skip_separators=True))
+        
+        # 使用代码块显示最新日志
+        st.code(recent_content, language=None)
+        
+        # 显示选项
+        col1, col2 = st.columns(2)
+        with col1:
+            show_full_conversion_log = st.checkbox("显示完整转换日志", value=False, key="show_full_conversion_logs")
+        with col2:
+            auto_refresh_conversion = st.checkbox("自动刷新", value=True, key="auto_refresh_conversion_logs")
+        
+        # 显示完整日志（可选）
+        if show_full_conversion_log:
+            st.markdown("**📋 完整转换日志:**")
+            st.text_area(
+                "转换日志:",
+                value=truncate_log_for_display(conversion_output),
+                height=400,
+                key="conversion_output_area"
+            )
+        
+        # 显示日志统计
+        total_lines = count_non_empty_log_lines("conversion", conversion_output)
+        st.caption(f"📊 总计 {total_lines} 行有效日志 | 🕒 最后更新: {datetime.now().strftime('%H:%M:%S')}")
+        
+    else:
+        st.info("暂无转换日志（可以刷新一下浏览器）")
+    
+    # 转换开始/结束或切换自动刷新后，重新运行整个页面以更新fragment的定时刷新设置和转换结果列表
+    auto_refresh = current_status == "converting" and auto_refresh_conversion
+    if auto_refresh != st.session_state.get("conversion_output_auto_refresh", False):
+        st.rerun()
+
 def model_conversion_section():
     """模型转换部分 - 优化版本"""
     st.subheader("🔄 转换pt为MaixCam模型")
@@ -1963,16 +2832,7 @@ def model_conversion_section():
     current_status = status.get("status")
     
     # 显示状态
-    status_icons = {
-        "idle": "⚪ 待机中",
-        "running": "🟢 训练中...",
-        "converting": "🔄 转换中...",
-        "completed": "✅ 完成",
-        "failed": "❌ 失败",
-        "stopped": "⏹️ 已停止"
-    }
-    
-    status_text = status_icons.get(current_status, current_status)
+    status_text = CONVERSION_STATUS_ICONS.get(current_status, current_status)
     st.write(f"**当前状态:** {status_text}")
     
     # 查找可用的模型
@@ -2014,11 +2874,11 @@ def model_conversion_section():
                 st.code(os.path.abspath(selected_model["path"]))
                 
                 if os.path.exists(MAPPING_FILE):
-                    with open(MAPPING_FILE, 'r', encoding='utf-8') as f:
-                        all_mappings = json.load(f)
+                    # 映射记录可能很多，勾选后才发送到页面；复用已缓存的映射解析结果，所有路径合并到一个代码块中显示
+                    if st.checkbox("显示映射文件中的所有路径", value=False, key="show_mapping_keys_checkbox"):
+                        all_mappings, _ = load_pt_dataset_mapping()
                         st.write("**映射文件中的所有路径:**")
-                        for key in all_mappings.keys():
-                            st.code(key)
+                        st.code("\n".join(all_mappings.keys()), language=None)
                 else:
                     st.error("映射文件不存在")
         
@@ -2050,13 +2910,7 @@ def model_conversion_section():
             
             # 这些参数暂时不会实际使用，但保留UI元素供未来扩展
             st.markdown("以下参数当前固定:")
-            st.code("""
-batch=1                  # 批次大小固定为1，适合设备推理
-include=['onnx']         # 仅导出ONNX格式
-half=True                # 使用FP16半精度
-int8=False               # 不使用INT8量化
-device=0                 # 使用第一个GPU设备
-""", language="bash")
+            st.code(ONNX_FIXED_PARAMS, language="bash")
         
         # 转换按钮
         col1, col2, col3 = st.columns(3)
@@ -2084,397 +2938,265 @@ device=0                 # 使用第一个GPU设备
                 st.button("⏹️ 停止转换", disabled=True, key="stop_conversion_btn_disabled")
         
         with col3:
-            if st.button("🔄 刷新状态", key="refresh_conversion_status_btn"):
-                st.rerun()
+            # 点击按钮本身就会重新运行页面；同时清空目录扫描缓存，立即显示原地覆盖写入的文件
+            st.button("🔄 刷新状态", key="refresh_conversion_status_btn", on_click=clear_scan_cache)
         
         # ===== 优化后的转换输出日志显示部分 =====
-        st.markdown("### 📄 转换输出日志")
-        conversion_output = read_conversion_output()
+        # 转换进行中时日志区域作为fragment定时单独刷新，进度和日志更新时不重新运行整个页面
+        auto_refresh = (current_status == "converting"
+                        and st.session_state.get("auto_refresh_conversion_logs", True))
+        st.session_state.conversion_output_auto_refresh = auto_refresh
+        st.fragment(conversion_output_section, run_every=CONVERSION_OUTPUT_REFRESH_INTERVAL if auto_refresh else None)()
         
-        if conversion_output:
-            # 提取转换关键信息
-            conversion_info = extract_conversion_info(conversion_output)
-            
-            # 显示转换进度摘要
-            if conversion_info["current_step"]:
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("🔄 当前步骤", conversion_info["current_step"])
-                with col2:
-                    st.metric("📈 转换进度", f"{conversion_info['progress_percentage']:.0f}%")
-                with col3:
-                    if conversion_info["conversion_name"]:
-                        st.metric("📦 转换任务", conversion_info["conversion_name"])
-                
-                # 显示进度条
-                progress_bar = st.progress(conversion_info['progress_percentage'] / 100)
-            
-            # 显示转换状态摘要
-            if any([conversion_info["images_collected"], conversion_info["onnx_conversion_status"], 
-                   conversion_info["cvimodel_conversion_status"], conversion_info["mud_file_created"],
-                   conversion_info["script_file_created"]]):
+        # ===== 新增：显示转换结果和下载功能 =====
+        # 作为fragment运行：查看内容、准备下载、加载更多只重新运行结果区域，不重新运行整个页面
+        st.fragment(conversion_results_section)()
+
+def conversion_results_section():
+    """转换结果和下载区域"""
+    st.markdown("### 📦 转换结果和下载")
+    
+    # 查找已转换的模型包
+    converted_packages = find_model_packages()
+    converted_cvimodels = find_converted_cvimodels()
+    
+    if converted_packages:
+        st.success(f"✅ 发现 {len(converted_packages)} 个完整模型包")
+        
+        # 显示模型包列表
+        visible_count = st.session_state.get("conversion_results_visible", RESULTS_PAGE_SIZE)
+        for i, package in enumerate(converted_packages[:visible_count]):
+            # 只为显示出来的条目格式化时间，标题和详情共用
+            time_text = package['time'].strftime('%Y-%m-%d %H:%M:%S')
+            with st.expander(f"📦 {package['name']} ({package['size']:.2f} MB) - {time_text}", expanded=(i==0)):
+                col1, col2, col3 = st.columns([2, 1, 1])
                 
-                st.markdown("**🎯 转换状态摘要:**")
+                with col1:
+                    st.info(f"**文件路径:** `{package['path']}`")
+                    st.info(f"**转换任务:** {package['export_dir']}")
+                    st.info(f"**文件大小:** {package['size']:.2f} MB")
+                    st.info(f"**创建时间:** {time_text}")
                 
-                status_cols = st.columns(5)  # 增加一列用于显示脚本状态
+                with col2:
+                    # 使用Streamlit的download_button提供下载功能
+                    try:
+                        show_download_button(
+                            package['path'],
+                            key=f"download_package_{i}",
+                            label="📥 下载完整模型包",
+                            file_name=package['name'],
+                            mime="application/zip",
+                            type="primary"
+                        )
+                    except Exception as e:
+                        st.error(f"准备下载失败: {str(e)}")
                 
-                with status_cols[0]:
-                    if conversion_info["images_collected"]:
-                        st.info(f"📸 图片收集: {conversion_info['images_collected']}张")
-                    if conversion_info["images_copied"]:
-                        st.info(f"📋 图片复制: {conversion_info['images_copied']}张")
+                with col3:
+                    # 显示包含内容预览
+                    if st.button(f"🔍 查看内容", key=f"show_content_{i}"):
+                        try:
+                            file_list = get_zip_namelist(package['path'])
+                            st.markdown("**ZIP包内容:**")
+                            content_lines = []
+                            for file in file_list:
+                                if file.endswith('.py'):
+                                    content_lines.append(f"🐍 {file}")  # Python脚本用蛇图标
+                                elif file.endswith('.cvimodel'):
+                                    content_lines.append(f"🎯 {file}")  # CviModel用靶心图标
+                                elif file.endswith('.mud'):
+                                    content_lines.append(f"📋 {file}")  # MUD文件用剪贴板图标
+                                else:
+                                    content_lines.append(f"📄 {file}")
+                            # 所有文件合并为一个元素发送
+                            st.text("\n".join(content_lines))
+                        except Exception as e:
+                            st.error(f"读取ZIP内容失败: {str(e)}")
+        
+        show_load_more_button(len(converted_packages), visible_count, "load_more_packages")
+    
+    elif converted_cvimodels:
+        st.warning("⚠️ 发现CviModel文件但无完整模型包")
+        
+        # 显示CviModel文件列表
+        visible_count = st.session_state.get("conversion_results_visible", RESULTS_PAGE_SIZE)
+        for i, cvimodel in enumerate(converted_cvimodels[:visible_count]):
+            # 只为显示出来的条目格式化时间，标题和详情共用
+            time_text = cvimodel['time'].strftime('%Y-%m-%d %H:%M:%S')
+            with st.expander(f"🎯 {cvimodel['name']} ({cvimodel['size']:.2f} MB) - {time_text}", expanded=(i==0)):
+                col1, col2 = st.columns([2, 1])
                 
-                with status_cols[1]:
-                    if conversion_info["onnx_conversion_status"]:
-                        if conversion_info["onnx_conversion_status"] == "成功":
-                            st.success(f"🔄 ONNX: {conversion_info['onnx_conversion_status']}")
-                        else:
-                            st.error(f"🔄 ONNX: {conversion_info['onnx_conversion_status']}")
+                with col1:
+                    st.info(f"**文件路径:** `{cvimodel['path']}`")
+                    st.info(f"**转换任务:** {cvimodel['export_dir']}")
+                    st.info(f"**文件大小:** {cvimodel['size']:.2f} MB")
+                    st.info(f"**创建时间:** {time_text}")
                 
-                with status_cols[2]:
-                    if conversion_info["cvimodel_conversion_status"]:
-                        if conversion_info["cvimodel_conversion_status"] == "成功":
-                            st.success(f"🎯 CviModel: {conversion_info['cvimodel_conversion_status']}")
-                        else:
-                            st.error(f"🎯 CviModel: {conversion_info['cvimodel_conversion_status']}")
+                with col2:
+                    # 下载单独的CviModel文件
+                    try:
+                        show_download_button(
+                            cvimodel['path'],
+                            key=f"download_cvimodel_{i}",
+                            label="📥 下载CviModel",
+                            file_name=cvimodel['name'],
+                            mime="application/octet-stream",
+                            type="secondary"
+                        )
+                    except Exception as e:
+                        st.error(f"准备下载失败: {str(e)}")
                 
-                with status_cols[3]:
-                    if conversion_info["mud_file_created"]:
-                        if conversion_info["mud_file_created"] == "成功":
-                            st.success(f"📋 MUD: {conversion_info['mud_file_created']}")
-                        else:
-                            st.error(f"📋 MUD: {conversion_info['mud_file_created']}")
+                # 检查是否有对应的MUD文件和脚本文件
+                mud_file_path = cvimodel['path'].replace('.cvimodel', '.mud')
+                script_file_path = os.path.join(os.path.dirname(cvimodel['path']), 'onestep_yolov11_detect.py')
+                # 一次列出转换目录（缓存），代替逐个文件检查是否存在
+                export_file_names = {name for name, _, _, _ in list_directory_entries(os.path.dirname(cvimodel['path']))}
                 
-                with status_cols[4]:
-                    if conversion_info["script_file_created"]:
-                        if conversion_info["script_file_created"] == "成功":
-                            st.success(f"🐍 脚本: {conversion_info['script_file_created']}")
-                        else:
-                            st.error(f"🐍 脚本: {conversion_info['script_file_created']}")
-                    if conversion_info["zip_package_created"]:
-                        if conversion_info["zip_package_created"] == "成功":
-                            st.success(f"📦 ZIP: {conversion_info['zip_package_created']}")
-                        else:
-                            st.error(f"📦 ZIP: {conversion_info['zip_package_created']}")
-            
-            # 显示最新的几行日志（置顶显示）
-            st.markdown("**🔥 最新日志:**")
-            lines = conversion_output.split('\n')
-            
-            # 过滤掉空行和分隔线，取最后10行有内容的日志
-            non_empty_lines = [line for line in lines if line.strip() and not line.strip().startswith('=') and not line.strip().startswith('-')]
-            recent_lines = non_empty_lines[-10:] if len(non_empty_lines) >= 10 else non_empty_lines
-            
-            # 反转显示顺序，最新的在上面
-            recent_lines_reversed = list(reversed(recent_lines))
-            recent_content = '\n'.join(recent_lines_reversed)
-            
-            # 使用代码块显示最新日志
-            log_container = st.container()
-            with log_container:
-                st.code(recent_content, language=None)
-            
-            # 显示选项
-            col1, col2 = st.columns(2)
-            with col1:
-                show_full_conversion_log = st.checkbox("显示完整转换日志", value=False, key="show_full_conversion_logs")
-            with col2:
-                auto_refresh_conversion = st.checkbox("自动刷新", value=True, key="auto_refresh_conversion_logs")
-            
-            # 显示完整日志（可选）
-            if show_full_conversion_log:
-                st.markdown("**📋 完整转换日志:**")
-                st.text_area(
-                    "转换日志:",
-                    value=conversion_output,
-                    height=400,
-                    key="conversion_output_area"
-                )
-            
-            # 显示日志统计
-            total_lines = len([line for line in lines if line.strip()])
-            st.caption(f"📊 总计 {total_lines} 行有效日志 | 🕒 最后更新: {datetime.now().strftime('%H:%M:%S')}")
-            
-            # 如果正在转换，自动刷新
-            if current_status == "converting" and auto_refresh_conversion:
-                time.sleep(2)  # 每2秒刷新一次
-                st.rerun()
+                if os.path.basename(mud_file_path) in export_file_names:
+                    try:
+                        show_download_button(
+                            mud_file_path,
+                            key=f"download_mud_{i}",
+                            label="📋 下载MUD配置",
+                            file_name=os.path.basename(mud_file_path),
+                            mime="text/plain",
+                            type="secondary"
+                        )
+                    except Exception as e:
+                        st.error(f"准备MUD下载失败: {str(e)}")
                 
-        else:
-            st.info("暂无转换日志（可以刷新一下浏览器）")
-        
-        # ===== 新增：显示转换结果和下载功能 =====
-        st.markdown("### 📦 转换结果和下载")
-        
-        # 查找已转换的模型包
-        converted_packages = find_model_packages()
-        converted_cvimodels = find_converted_cvimodels()
-        
-        if converted_packages:
-            st.success(f"✅ 发现 {len(converted_packages)} 个完整模型包")
-            
-            # 显示模型包列表
-            for i, package in enumerate(converted_packages):
-                with st.expander(f"📦 {package['name']} ({package['size']:.2f} MB) - {package['time'].strftime('%Y-%m-%d %H:%M:%S')}", expanded=(i==0)):
-                    col1, col2, col3 = st.columns([2, 1, 1])
-                    
-                    with col1:
-                        st.info(f"**文件路径:** `{package['path']}`")
-                        st.info(f"**转换任务:** {package['export_dir']}")
-                        st.info(f"**文件大小:** {package['size']:.2f} MB")
-                        st.info(f"**创建时间:** {package['time'].strftime('%Y-%m-%d %H:%M:%S')}")
-                    
-                    with col2:
-                        # 使用Streamlit的download_button提供下载功能
-                        try:
-                            with open(package['path'], "rb") as file:
-                                file_bytes = file.read()
-                            
-                            st.download_button(
-                                label="📥 下载完整模型包",
-                                data=file_bytes,
-                                file_name=package['name'],
-                                mime="application/zip",
-                                key=f"download_package_{i}",
-                                type="primary"
-                            )
-                        except Exception as e:
-                            st.error(f"准备下载失败: {str(e)}")
-                    
-                    with col3:
-                        # 显示包含内容预览
-                        if st.button(f"🔍 查看内容", key=f"show_content_{i}"):
-                            try:
-                                import zipfile
-                                with zipfile.ZipFile(package['path'], 'r') as zip_ref:
-                                    file_list = zip_ref.namelist()
-                                    st.markdown("**ZIP包内容:**")
-                                    for file in file_list:
-                                        if file.endswith('.py'):
-                                            st.text(f"🐍 {file}")  # Python脚本用蛇图标
-                                        elif file.endswith('.cvimodel'):
-                                            st.text(f"🎯 {file}")  # CviModel用靶心图标
-                                        elif file.endswith('.mud'):
-                                            st.text(f"📋 {file}")  # MUD文件用剪贴板图标
-                                        else:
-                                            st.text(f"📄 {file}")
-                            except Exception as e:
-                                st.error(f"读取ZIP内容失败: {str(e)}")
-        
-        elif converted_cvimodels:
-            st.warning("⚠️ 发现CviModel文件但无完整模型包")
-            
-            # 显示CviModel文件列表
-            for i, cvimodel in enumerate(converted_cvimodels):
-                with st.expander(f"🎯 {cvimodel['name']} ({cvimodel['size']:.2f} MB) - {cvimodel['time'].strftime('%Y-%m-%d %H:%M:%S')}", expanded=(i==0)):
-                    col1, col2 = st.columns([2, 1])
-                    
-                    with col1:
-                        st.info(f"**文件路径:** `{cvimodel['path']}`")
-                        st.info(f"**转换任务:** {cvimodel['export_dir']}")
-                        st.info(f"**文件大小:** {cvimodel['size']:.2f} MB")
-                        st.info(f"**创建时间:** {cvimodel['time'].strftime('%Y-%m-%d %H:%M:%S')}")
-                    
-                    with col2:
-                        # 下载单独的CviModel文件
-                        try:
-                            with open(cvimodel['path'], "rb") as file:
-                                file_bytes = file.read()
-                            
-                            st.download_button(
-                                label="📥 下载CviModel",
-                                data=file_bytes,
-                                file_name=cvimodel['name'],
-                                mime="application/octet-stream",
-                                key=f"download_cvimodel_{i}",
-                                type="secondary"
-                            )
-                        except Exception as e:
-                            st.error(f"准备下载失败: {str(e)}")
-                    
-                    # 检查是否有对应的MUD文件和脚本文件
-                    mud_file_path = cvimodel['path'].replace('.cvimodel', '.mud')
-                    script_file_path = os.path.join(os.path.dirname(cvimodel['path']), 'onestep_yolov11_detect.py')
-                    
-                    if os.path.exists(mud_file_path):
-                        try:
-                            with open(mud_file_path, "rb") as file:
-                                mud_bytes = file.read()
-                            
-                            st.download_button(
-                                label="📋 下载MUD配置",
-                                data=mud_bytes,
-                                file_name=os.path.basename(mud_file_path),
-                                mime="text/plain",
-                                key=f"download_mud_{i}",
-                                type="secondary"
-                            )
-                        except Exception as e:
-                            st.error(f"准备MUD下载失败: {str(e)}")
-                    
-                    if os.path.exists(script_file_path):
-                        try:
-                            with open(script_file_path, "rb") as file:
-                                script_bytes = file.read()
-                            
-                            st.download_button(
-                                label="🐍 下载检测脚本",
-                                data=script_bytes,
-                                file_name="onestep_yolov11_detect.py",
-                                mime="text/plain",
-                                key=f"download_script_{i}",
-                                type="secondary"
-                            )
-                        except Exception as e:
-                            st.error(f"准备脚本下载失败: {str(e)}")
-        
-        else:
-            st.info("💡 暂无转换完成的模型包。完成模型转换后，下载按钮将在此处显示。")
-            
-            # 显示transfer目录的所有内容（用于调试）
-            transfer_dir = "transfer"
-            if os.path.exists(transfer_dir):
-                with st.expander("🔍 调试：查看transfer目录内容"):
-                    for item in os.listdir(transfer_dir):
-                        item_path = os.path.join(transfer_dir, item)
-                        if os.path.isdir(item_path):
-                            st.write(f"📁 {item}/")
-                            # 显示子目录内容
-                            for subitem in os.listdir(item_path):
-                                subitem_path = os.path.join(item_path, subitem)
-                                if os.path.isfile(subitem_path):
-                                    size_mb = os.path.getsize(subitem_path) / (1024 * 1024)
-                                    if subitem.endswith('.py'):
-                                        st.write(f"   🐍 {subitem} ({size_mb:.2f} MB)")
-                                    elif subitem.endswith('.cvimodel'):
-                                        st.write(f"   🎯 {subitem} ({size_mb:.2f} MB)")
-                                    elif subitem.endswith('.mud'):
-                                        st.write(f"   📋 {subitem} ({size_mb:.2f} MB)")
-                                    else:
-                                        st.write(f"   📄 {subitem} ({size_mb:.2f} MB)")
+                if 'onestep_yolov11_detect.py' in export_file_names:
+                    try:
+                        show_download_button(
+                            script_file_path,
+                            key=f"download_script_{i}",
+                            label="🐍 下载检测脚本",
+                            file_name="onestep_yolov11_detect.py",
+                            mime="text/plain",
+                            type="secondary"
+                        )
+                    except Exception as e:
+                        st.error(f"准备脚本下载失败: {str(e)}")
+        
+        show_load_more_button(len(converted_cvimodels), visible_count, "load_more_cvimodels")
+    
+    else:
+        st.info("💡 暂无转换完成的模型包。完成模型转换后，下载按钮将在此处显示。")
+        
+        # 显示transfer目录的所有内容（用于调试）
+        transfer_dir = "transfer"
+        if os.path.exists(transfer_dir):
+            with st.expander("🔍 调试：查看transfer目录内容"):
+                # 按修改时间排序，最新的在前面（修改时间来自列目录时的同一次stat）
+                items = sorted(list_directory_entries(transfer_dir), key=lambda entry: entry[3], reverse=True)
+                for item, item_is_dir, _, _ in items:
+                    if item_is_dir:
+                        st.write(f"📁 {item}/")
+                        # 显示子目录内容
+                        for subitem, subitem_is_dir, subitem_size, _ in list_directory_entries(os.path.join(transfer_dir, item)):
+                            if not subitem_is_dir:
+                                size_mb = subitem_size / (1024 * 1024)
+                                if subitem.endswith('.py'):
+                                    st.write(f"   🐍 {subitem} ({size_mb:.2f} MB)")
+                                elif subitem.endswith('.cvimodel'):
+                                    st.write(f"   🎯 {subitem} ({size_mb:.2f} MB)")
+                                elif subitem.endswith('.mud'):
+                                    st.write(f"   📋 {subitem} ({size_mb:.2f} MB)")
                                 else:
-                                    st.write(f"   📁 {subitem}/")
-            else:
-                st.info("transfer目录不存在")
+                                    st.write(f"   📄 {subitem} ({size_mb:.2f} MB)")
+                            else:
+                                st.write(f"   📁 {subitem}/")
+        else:
+            st.info("transfer目录不存在")
 
 # ==================== Docker环境检查函数 (示例修改) ====================
 
 def check_docker_environment(messages_list):
-    """检查Docker环境是否可用 - 修改为接收消息列表参数"""
+    """检查Docker环境是否可用 - 一次docker info调用同时确认安装、服务状态和权限
+    
+    成功时返回docker info的解析结果（供后续检查复用），失败时返回None
+    """
     try:
         messages_list.append("🔍 检查Docker环境...")
         
-        env = os.environ.copy()
-        env['PYTHONIOENCODING'] = 'utf-8'
-        if platform.system() == "Windows":
-            env['CHCP'] = '65001'
-        
-        result = subprocess.run(['docker', '--version'], 
-                              capture_output=True, text=True, timeout=10,
-                              encoding='utf-8', errors='replace', env=env)
-        if result.returncode != 0:
-            messages_list.append("❌ Docker未安装或无法访问")
-            messages_list.append("请安装Docker: https://docs.docker.com/get-docker/")
-            return False
-        
-        messages_list.append(f"✅ Docker已安装: {result.stdout.strip()}")
+        env = SUBPROCESS_ENV
         
-        result = subprocess.run(['docker', 'info'], 
+        result = subprocess.run(['docker', 'info', '--format', '{{json .}}'], 
                               capture_output=True, text=True, timeout=10,
                               encoding='utf-8', errors='replace', env=env)
-        if result.returncode != 0:
-            messages_list.append("❌ Docker服务未运行")
-            messages_list.append("请启动Docker服务")
-            return False
+        docker_info = None
+        if result.returncode == 0:
+            try:
+                docker_info = json_loads(result.stdout)
+            except ValueError:
+                docker_info = None
+        
+        # 命令失败或守护进程报错时，根据错误信息区分权限不足和服务未运行
+        server_errors = docker_info.get("ServerErrors") if docker_info else None
+        if docker_info is None or server_errors:
+            error_text = "\n".join(server_errors or []) or result.stderr
+            if "permission denied" in error_text.lower():
+                messages_list.append("❌ Docker权限不足，请运行:")
+                messages_list.append("  sudo usermod -aG docker $USER")
+                messages_list.append("  然后重新登录或重启系统")
+                messages_list.append("  或者使用sudo运行此应用")
+            else:
+                messages_list.append("❌ Docker服务未运行")
+                messages_list.append("请启动Docker服务")
+                if error_text.strip():
+                    messages_list.append(f"错误信息: {error_text.strip()}")
+            return None
         
+        messages_list.append(f"✅ Docker已安装: {docker_info.get('ServerVersion', '未知版本')}")
         messages_list.append("✅ Docker服务正在运行")
-        
-        if not check_docker_permissions(messages_list):
-            return False
-            
-        return True
+        messages_list.append("✅ Docker权限检查通过")
+        return docker_info
         
     except subprocess.TimeoutExpired:
         messages_list.append("❌ Docker命令超时，请检查Docker是否正常运行")
-        return False
+        return None
     except FileNotFoundError:
         messages_list.append("❌ 未找到Docker命令，请确认Docker已正确安装")
-        return False
+        messages_list.append("请安装Docker: https://docs.docker.com/get-docker/")
+        return None
     except Exception as e:
         messages_list.append(f"❌ 检查Docker环境时发生错误: {str(e)}")
-        return False
+        return None
 
-def check_docker_permissions(messages_list):
-    """检查Docker权限（Linux特有问题）"""
-    try:
-        env = os.environ.copy()
-        env['PYTHONIOENCODING'] = 'utf-8'
-        if platform.system() == "Windows":
-            env['CHCP'] = '65001'
-        
-        result = subprocess.run(['docker', 'ps'], 
-                              capture_output=True, text=True, timeout=10,
-                              encoding='utf-8', errors='replace', env=env)
-        if result.returncode != 0:
-            if "permission denied" in result.stderr.lower():
-                messages_list.append("❌ Docker权限不足，请运行:")
-                messages_list.append("  sudo usermod -aG docker $USER")
-                messages_list.append("  然后重新登录或重启系统")
-                messages_list.append("  或者使用sudo运行此应用")
-                return False
-            else:
-                messages_list.append(f"❌ Docker命令执行失败: {result.stderr}")
-                return False
-        
-        messages_list.append("✅ Docker权限检查通过")
+
+def check_nvidia_docker(messages_list, docker_info):
+    """检查NVIDIA Docker支持：根据docker info中注册的运行时判断，无需拉取CUDA镜像启动容器"""
+    messages_list.append("🔍 检查NVIDIA Docker支持...")
+    
+    if "nvidia" in (docker_info.get("Runtimes") or {}):
+        messages_list.append("✅ NVIDIA Docker支持正常")
         return True
-    except Exception as e:
-        messages_list.append(f"❌ 检查Docker权限时发生错误: {e}")
+    else:
+        messages_list.append("⚠️ NVIDIA Docker支持不可用，将使用CPU训练")
         return False
 
+def normalize_image_name(image_name):
+    """补全镜像标签，未写标签的镜像名按docker的约定视为:latest"""
+    if ':' not in image_name.rsplit('/', 1)[-1]:
+        return f"{image_name}:latest"
+    return image_name
 
-def check_nvidia_docker(messages_list):
-    """检查NVIDIA Docker支持"""
-    try:
-        messages_list.append("🔍 检查NVIDIA Docker支持...")
-        
-        env = os.environ.copy()
-        env['PYTHONIOENCODING'] = 'utf-8'
-        if platform.system() == "Windows":
-            env['CHCP'] = '65001'
-        
-        result = subprocess.run([
-            'docker', 'run', '--rm', '--gpus', 'all', 
-            'nvidia/cuda:11.8-base-ubuntu20.04', 'nvidia-smi'
-        ], capture_output=True, text=True, timeout=30,
-           encoding='utf-8', errors='replace', env=env)
-        
-        if result.returncode == 0:
-            messages_list.append("✅ NVIDIA Docker支持正常")
-            return True
-        else:
-            messages_list.append("⚠️ NVIDIA Docker支持不可用，将使用CPU训练")
-            return False
-    except Exception as e:
-        messages_list.append(f"⚠️ 检查NVIDIA Docker时出错: {e}")
-        return False
-
-def check_docker_image_exists(image_name, messages_list=None):
-    """检查Docker镜像是否存在"""
+def list_local_docker_images(messages_list=None):
+    """一次docker images调用列出本地所有镜像，返回 仓库:标签 的集合"""
     try:
-        env = os.environ.copy()
-        env['PYTHONIOENCODING'] = 'utf-8'
-        if platform.system() == "Windows":
-            env['CHCP'] = '65001'
+        env = SUBPROCESS_ENV
         
-        result = subprocess.run(['docker', 'images', '-q', image_name], 
+        result = subprocess.run(['docker', 'images', '--format', '{{.Repository}}:{{.Tag}}'], 
                               capture_output=True, text=True, timeout=30,
                               encoding='utf-8', errors='replace', env=env)
-        return result.returncode == 0 and result.stdout.strip() != ""
+        if result.returncode != 0:
+            if messages_list is not None:
+                messages_list.append(f"❌ 列出本地镜像失败: {result.stderr.strip()}")
+            return set()
+        return set(result.stdout.split())
     except Exception as e:
-        if messages_list:
-            messages_list.append(f"❌ 检查镜像 {image_name} 时发生错误: {str(e)}")
-        return False
+        if messages_list is not None:
+            messages_list.append(f"❌ 列出本地镜像时发生错误: {str(e)}")
+        return set()
 
 def pull_docker_image(image_name, messages_list):
     """拉取Docker镜像"""
@@ -2482,10 +3204,7 @@ def pull_docker_image(image_name, messages_list):
         messages_list.append(f"📥 正在下载Docker镜像: {image_name}")
         messages_list.append("这可能需要几分钟时间，请耐心等待...")
         
-        env = os.environ.copy()
-        env['PYTHONIOENCODING'] = 'utf-8'
-        if platform.system() == "Windows":
-            env['CHCP'] = '65001'
+        env = SUBPROCESS_ENV
         
         result = subprocess.run(['docker', 'pull', image_name], 
                               capture_output=True, text=True, timeout=1800,
@@ -2513,8 +3232,10 @@ def check_and_pull_docker_images(messages_list): # 新增 messages_list 参数
     missing_images = []
     all_successful = True
 
+    # 只调用一次docker images，之后在本地集合中判断镜像是否存在
+    local_images = list_local_docker_images(messages_list)
     for image in REQUIRED_DOCKER_IMAGES:
-        if check_docker_image_exists(image, messages_list): # 传递 messages_list
+        if normalize_image_name(image) in local_images:
             messages_list.append(f"✅ 镜像已存在: {image}")
         else:
             messages_list.append(f"⚠️  镜像不存在: {image}")
@@ -2522,11 +3243,15 @@ def check_and_pull_docker_images(messages_list): # 新增 messages_list 参数
 
     if missing_images:
         messages_list.append(f"\n📥 需要下载 {len(missing_images)} 个镜像...")
-        for image in missing_images:
-            if not pull_docker_image(image, messages_list): # 传递 messages_list
+        # 各镜像并行拉取，每个镜像使用独立的消息列表，完成后按顺序合并，避免消息交错
+        image_messages = [[] for _ in missing_images]
+        with ThreadPoolExecutor(max_workers=min(DOCKER_PULL_WORKERS, len(missing_images))) as executor:
+            results = list(executor.map(pull_docker_image, missing_images, image_messages))
+        for image, messages, success in zip(missing_images, image_messages, results):
+            messages_list.extend(messages)
+            if not success:
                 messages_list.append(f"❌ 无法下载镜像: {image}")
                 all_successful = False # 标记下载失败
-                # return False # 如果一个失败就整体失败
     if not all_successful:
         return False
 
@@ -2550,14 +3275,18 @@ def initialize_environment():
             messages.append(f"❌ 创建目录失败: {dir_name}")
             return False, messages
     
+    # 迁移/压缩pt与数据集的映射文件
+    compact_pt_dataset_mapping()
+    
     # 检查Docker环境
-    if not check_docker_environment(messages):
+    docker_info = check_docker_environment(messages)
+    if docker_info is None:
         messages.append("❌ Docker环境检查失败，程序可能无法正常运行")
         return False, messages
     
     # Linux下检查NVIDIA Docker（可选）
     if platform_info['is_linux']:
-        check_nvidia_docker(messages)
+        check_nvidia_docker(messages, docker_info)
     
     # 检查并下载Docker镜像
     if not check_and_pull_docker_images(messages):
@@ -2663,25 +3392,15 @@ def main():
         st.subheader("🚀 训练控制")
 
         # 状态显示
-        status_icons = {
-            "idle": "⚪ 待机中",
-            "running": "🟢 训练中...",
-            "converting": "🔄 转换中...",
-            "completed": "✅ 训练完成",
-            "failed": "❌ 训练失败",
-            "stopped": "⏹️ 已停止"
-        }
-
-        status_text = status_icons.get(current_status["status"], current_status["status"])
+        status_text = TRAINING_STATUS_ICONS.get(current_status["status"], current_status["status"])
         st.write(f"**当前状态:** {status_text}")
 
         # 添加训练参数设置
         st.markdown("### ⚙️ 训练参数设置")
 
-        model_options = ["yolo11n.pt"]
         selected_model = st.selectbox(
             "选择模型:",
-            model_options,
+            TRAINING_MODEL_OPTIONS,
             index=0,
             help="选择YOLOv11模型版本，n(nano)最小，x(xlarge)最大"
         )
@@ -2695,26 +3414,16 @@ def main():
             help="训练循环的总轮数，更多的轮数可能获得更好的结果，但训练时间更长"
         )
 
-        img_size_options = [320, 416, 512, 640, 768, 896, 1024, 1280]
         selected_img_size = st.select_slider(
             "图片尺寸 (Image Size):",
-            options=img_size_options,
+            options=TRAINING_IMG_SIZE_OPTIONS,
             value=640,
             help="训练图片尺寸，更大的尺寸可能提高准确率，但会增加显存需求和训练时间"
         )
 
         with st.expander("高级参数设置"):
             st.markdown("以下是当前固定的高级参数，将在未来版本中开放设置")
-            st.code("""
-batch=16                 # 批次大小
-patience=50              # 早停耐心值
-optimizer='auto'         # 优化器
-lr0=0.01                 # 初始学习率
-cos_lr=True              # 是否使用余弦学习率调度
-weight_decay=0.0005      # 权重衰减
-dropout=0.0              # 丢弃率
-label_smoothing=0.0      # 标签平滑
-""", language="bash")
+            st.code(TRAINING_FIXED_PARAMS, language="bash")
 
         col1, col2, col3, col4 = st.columns(4)
 
@@ -2745,8 +3454,8 @@ label_smoothing=0.0      # 标签平滑
                 st.button("⏹️ 停止训练", disabled=True, key="stop_training_btn_disabled")
 
         with col3:
-            if st.button("🔄 刷新状态", key="refresh_training_status_btn"):
-                st.rerun()
+            # 点击按钮本身就会重新运行页面，无需再调用st.rerun()；同时清空目录扫描缓存
+            st.button("🔄 刷新状态", key="refresh_training_status_btn", on_click=clear_scan_cache)
 
         with col4:
             if st.button("🧹 清空日志", key="clear_logs_btn"):
@@ -2754,69 +3463,21 @@ label_smoothing=0.0      # 标签平滑
                 st.success("日志已清空")
                 st.rerun()
 
-        with st.expander("🔍 查看执行的Docker命令"):
+        # st.expander无法得知是否展开，其内容每次都会生成；改用开关，只在打开时才生成命令预览
+        if st.toggle("🔍 查看执行的Docker命令", value=False, key="show_docker_command_toggle"):
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             run_name = f"train_{timestamp}"
             docker_cmd, _, _, _ = build_docker_training_command(
-                selected_model, epochs, selected_img_size, run_name
+                selected_model, epochs, selected_img_size, run_name, ensure_dirs=False
             )
-            st.code(docker_cmd, language='bash')
+            st.code(format_command(docker_cmd), language='bash')
 
     with tab3:
-        st.subheader("📺 训练输出")
-        output_content = read_output()
-        if output_content:
-            training_info = extract_training_info(output_content)
-            if training_info["current_epoch"]:
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("📊 当前Epoch", f"{training_info['current_epoch']}/{training_info['total_epochs']}")
-                with col2:
-                    st.metric("📈 训练进度", f"{training_info['progress_percentage']:.1f}%")
-                with col3:
-                    if training_info["latest_metrics"]:
-                        if "mAP50-95" in training_info["latest_metrics"]:
-                            try:
-                                map_value = training_info["latest_metrics"].split()[-1]
-                                st.metric("🎯 mAP50-95", map_value)
-                            except:
-                                st.metric("🎯 最新指标", "计算中...")
-                progress_bar = st.progress(training_info['progress_percentage'] / 100)
-
-            st.markdown("**🔥 最新日志:**")
-            lines = output_content.split('\n')
-            non_empty_lines = [line for line in lines if line.strip()]
-            recent_lines = non_empty_lines[-10:] if len(non_empty_lines) >= 10 else non_empty_lines
-            recent_lines_reversed = list(reversed(recent_lines))
-            recent_content = '\n'.join(recent_lines_reversed)
-            log_container = st.container()
-            with log_container:
-                st.code(recent_content, language=None)
-
-            col1, col2 = st.columns(2)
-            with col1:
-                show_full_log = st.checkbox("显示完整日志", value=False, key="show_full_logs_checkbox")
-            with col2:
-                auto_scroll = st.checkbox("自动刷新", value=True, key="auto_refresh_logs_checkbox")
-
-            if show_full_log:
-                st.markdown("**📋 完整训练日志:**")
-                st.text_area(
-                    "所有日志内容:",
-                    value=output_content,
-                    height=300,
-                    key="full_output_area"
-                )
-
-            total_lines = len([line for line in lines if line.strip()])
-            st.caption(f"📊 总计 {total_lines} 行有效日志 | 🕒 最后更新: {datetime.now().strftime('%H:%M:%S')}")
-        else:
-            st.info("暂无输出内容（可以浏览器刷新一下）")
-
-        # 关键修改：只有在训练进行中且用户开启自动刷新时才重新运行
-        if current_status["status"] == "running" and 'auto_scroll' in locals() and auto_scroll:
-            time.sleep(2)
-            st.rerun()
+        # 训练进行中时训练输出区域作为fragment定时单独刷新，不阻塞脚本线程，也不重新运行整个页面
+        auto_refresh = (current_status["status"] == "running"
+                        and st.session_state.get("auto_refresh_logs_checkbox", True))
+        st.session_state.training_output_auto_refresh = auto_refresh
+        st.fragment(training_output_section, run_every=TRAINING_OUTPUT_REFRESH_INTERVAL if auto_refresh else None)()
 
     with tab4:
         display_results()
@@ -2826,7 +3487,7 @@ label_smoothing=0.0      # 标签平滑
 
 
 if __name__ == "__main__":
-    if platform.system() == "Windows":
+    if IS_WINDOWS:
         os.system('chcp 65001 >nul 2>&1')
         os.environ['PYTHONIOENCODING'] = 'utf-8'
         os.environ['CHCP'] = '65001'
@@ -36,13 +36,14 @@ model_transform.py \
 
 # export bf16 model
 #   not use --quant_input, use float32 for easy coding
-model_deploy.py \
---mlir ${net_name}.mlir \
---quantize BF16 \
---processor cv181x \
---test_input ${net_name}_in_f32.npz \
---test_reference ${net_name}_top_outputs.npz \
---model ${net_name}_bf16.cvimodel
+#   skipped by default: only the int8 model is packaged, uncomment if the bf16 model is needed
+# model_deploy.py \
+# --mlir ${net_name}.mlir \
+# --quantize BF16 \
+# --processor cv181x \
+# --test_input ${net_name}_in_f32.npz \
+# --test_reference ${net_name}_top_outputs.npz \
+# --model ${net_name}_bf16.cvimodel
 
 echo "calibrate for int8 model"
 # export int8 model